@@ -0,0 +1,13 @@
+"""
+Settings for the benchmarks. Without DB_URI in the environment they run
+against a temporary SQLite file, export DB_URI (and DB_ASYNC_URI) to point
+them at a throwaway local Postgres or MySQL instead.
+"""
+import os
+import tempfile
+
+os.environ.setdefault('DB_URI', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+
+for _variable, _value in (('DB_NAME', 'bench'), ('DB_USERNAME', 'bench'), ('DB_PASSWORD', 'bench'),
+                          ('DB_SCHEME', 'psycopg2'), ('DB_MOTOR', 'postgres')):
+    os.environ.setdefault(_variable, _value)
@@ -0,0 +1,22 @@
+from sqlmodel import SQLModel
+
+from raw_dbmodel import Repository
+from raw_dbmodel.database import get_engine
+from tests.domain.schema import UserBase
+
+
+class BenchUser(UserBase, table=True):
+    __tablename__ = 'bench_usuarios'
+
+
+class BenchUserRepository(Repository[BenchUser]):
+
+    @property
+    def model(self):
+        return BenchUser
+
+
+def reset_table() -> None:
+    table = SQLModel.metadata.tables[BenchUser.__tablename__]
+    table.drop(get_engine(), checkfirst=True)
+    table.create(get_engine())
@@ -0,0 +1,49 @@
+"""
+Compare two result files of benchmarks.suite, exits with 1 when an
+operation lost more throughput than the threshold.
+
+    python -m benchmarks.compare baseline.json current.json --threshold 10
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=10.0, help='allowed throughput loss in percent')
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as file:
+        baseline = {(result['operation'], result['rows']): result for result in json.load(file)['results']}
+
+    with open(args.current) as file:
+        current = json.load(file)['results']
+
+    regressions = 0
+
+    for result in current:
+        before = baseline.get((result['operation'], result['rows']))
+
+        if before is None or before['rows_per_second'] == 0:
+            continue
+
+        change = (result['rows_per_second'] / before['rows_per_second'] - 1) * 100
+        flag = ''
+
+        if change < -args.threshold:
+            regressions += 1
+            flag = '  REGRESSION'
+
+        print(f"{result['operation']:<18} rows={result['rows']:<8} throughput {change:+7.1f}%  "
+              f"p50 {before['p50_ms']:9.3f} -> {result['p50_ms']:9.3f}ms  "
+              f"p99 {before['p99_ms']:9.3f} -> {result['p99_ms']:9.3f}ms{flag}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,34 @@
+"""
+Per-call latency of a primary key lookup through as_model / as_dict (cursor
+path) compared with as_df (pandas path, used by all of them before).
+
+    python -m benchmarks.single_row_lookup [iterations]
+"""
+import sys
+import timeit
+
+import benchmarks._environment  # noqa: F401 isort: skip
+from benchmarks._models import BenchUser as User, BenchUserRepository, reset_table
+
+
+def main(iterations: int = 1000) -> None:
+    reset_table()
+    repository = BenchUserRepository()
+    user = User(name='bench', email='bench@dev')
+    repository.insert_all(models=[user] + [User(name=f'bench{i}', email=f'bench{i}@dev') for i in range(1000)])
+
+    lookups = {
+        'as_df': lambda: repository.get_one(where={'id': user.id}).as_df(),
+        'as_dict': lambda: repository.get_one(where={'id': user.id}).as_dict(),
+        'as_model': lambda: repository.get_one(where={'id': user.id}).as_model(),
+    }
+
+    results = {name: min(timeit.repeat(lookup, number=iterations, repeat=3)) / iterations
+               for name, lookup in lookups.items()}
+
+    for name, seconds in results.items():
+        print(f"{name:<10} {seconds * 1e6:10.1f} us/call  x{results['as_df'] / seconds:.1f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,61 @@
+"""
+Time to import the package in a fresh interpreter, with no database settings
+in the environment, and the heavy modules the import pulled in. Exits with
+1 when the median is over --max-ms or one of those modules was imported.
+
+    python -m benchmarks.startup [--runs 10] [--max-ms 1000]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import List, Optional
+
+# loaded on first use only: as_df / bulk_load, pretty logging, as_arrow
+LAZY_MODULES = ('pandas', 'rich', 'yaml', 'pyarrow')
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import raw_dbmodel
+seconds = time.perf_counter() - start
+print(json.dumps([seconds, [module for module in {LAZY_MODULES!r} if module in sys.modules]]))
+"""
+
+
+def measure() -> List:
+    environment = {key: value for key, value in os.environ.items() if not key.startswith('DB_')}
+    output = subprocess.run([sys.executable, '-c', PROBE], env=environment, capture_output=True, text=True,
+                            check=True).stdout
+
+    return json.loads(output.splitlines()[-1])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--max-ms', type=float, default=None, help='fail when the median import time is higher')
+    args = parser.parse_args(argv)
+
+    runs = [measure() for _ in range(args.runs)]
+    median = statistics.median(seconds for seconds, _ in runs) * 1000
+    imported = sorted({module for _, modules in runs for module in modules})
+
+    print(f"import raw_dbmodel  {median:8.1f} ms median of {args.runs}  "
+          f"min {min(seconds for seconds, _ in runs) * 1000:.1f} ms")
+
+    if imported:
+        print(f"imported eagerly: {', '.join(imported)}")
+        return 1
+
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"slower than {args.max_ms:.0f} ms")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Throughput, p50/p99 latency and peak memory of every repository operation
+for several table sizes, written as JSON to compare between commits with
+benchmarks.compare.
+
+    python -m benchmarks.suite --rows 10,1000,100000 --output results.json
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tracemalloc
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import benchmarks._environment  # noqa: F401 isort: skip
+import sqlalchemy
+from benchmarks._models import BenchUser, BenchUserRepository, reset_table
+from raw_dbmodel.database import get_engine
+from raw_dbmodel.writer import BufferedWriter
+
+
+class Operation(NamedTuple):
+    name: str
+    call: Callable[[], Any]
+    rows_per_call: int
+    samples: int
+    setup: Optional[Callable[[], Any]] = None
+
+
+def percentile(values: List[float], q: int) -> float:
+    if len(values) == 1:
+        return values[0]
+
+    return statistics.quantiles(values, n=100, method='inclusive')[q - 1]
+
+
+def measure(operation: Operation, table_rows: int) -> Dict[str, Any]:
+    latencies = []
+
+    for _ in range(operation.samples):
+        if operation.setup is not None:
+            operation.setup()
+
+        start = perf_counter()
+        operation.call()
+        latencies.append(perf_counter() - start)
+
+    # an extra call under tracemalloc, it slows the call down too much to be timed
+    if operation.setup is not None:
+        operation.setup()
+
+    tracemalloc.start()
+    operation.call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = sum(latencies)
+
+    return {
+        'operation': operation.name,
+        'rows': table_rows,
+        'samples': operation.samples,
+        'rows_per_second': operation.rows_per_call * operation.samples / total if total > 0 else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'peak_memory_kb': peak / 1024,
+    }
+
+
+def operations(repository: BenchUserRepository, table_rows: int, samples: int) -> List[Operation]:
+    models = [BenchUser(name=f'bench{index}', email=f'bench{index}@dev') for index in range(table_rows)]
+    ids = [model.id for model in models]
+    inserted: List[str] = []
+    loads = 1 if table_rows > 10000 else 3
+
+    def insert() -> None:
+        model = BenchUser(name='bench_insert', email='bench_insert@dev')
+        repository.insert(model)
+        inserted.append(model.id)
+
+    def buffered_writer() -> None:
+        with BufferedWriter(repository) as writer:
+            writer.add_all(models)
+
+    return [
+        Operation('insert_all', lambda: repository.insert_all(models=models), table_rows, loads, reset_table),
+        Operation('bulk_load', lambda: repository.bulk_load(models), table_rows, loads, reset_table),
+        Operation('buffered_writer', buffered_writer, table_rows, loads, reset_table),
+        Operation('get_all', repository.get_all, table_rows, loads),
+        Operation('get_all.validate', lambda: repository.get_all(validate=True), table_rows, loads),
+        Operation('get_data.as_df', lambda: repository.get_data().as_df(), table_rows, loads),
+        Operation('fields.all', lambda: repository.fields('id, name').all(), table_rows, loads),
+        Operation('fields.as_df', lambda: repository.fields('id, name').as_df(), table_rows, loads),
+        Operation('get_one.as_model', lambda: repository.get_one(where={'id': random.choice(ids)}).as_model(),
+                  1, samples),
+        Operation('get_one.as_dict', lambda: repository.get_one(where={'id': random.choice(ids)}).as_dict(),
+                  1, samples),
+        Operation('get_one.as_df', lambda: repository.get_one(where={'id': random.choice(ids)}).as_df(),
+                  1, samples),
+        Operation('update', lambda: repository.update({'email': 'updated@dev'}, {'id': random.choice(ids)}),
+                  1, samples),
+        Operation('insert', insert, 1, samples),
+        Operation('delete', lambda: repository.delete({'id': inserted.pop()}), 1, samples),
+    ]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', default='10,1000,10000',
+                        help='comma separated table sizes, e.g. 10,1000,100000,1000000')
+    parser.add_argument('--samples', type=int, default=200, help='calls timed for single row operations')
+    parser.add_argument('--output', help='file to write the json results to')
+    args = parser.parse_args(argv)
+
+    repository = BenchUserRepository()
+    results = []
+
+    for table_rows in (int(rows) for rows in args.rows.split(',')):
+        reset_table()
+
+        for operation in operations(repository, table_rows, args.samples):
+            result = measure(operation, table_rows)
+            results.append(result)
+
+            print(f"{result['operation']:<18} rows={table_rows:<8} {result['rows_per_second']:12.0f} rows/s  "
+                  f"p50={result['p50_ms']:9.3f}ms  p99={result['p99_ms']:9.3f}ms  "
+                  f"peak={result['peak_memory_kb']:10.1f}KiB", file=sys.stderr)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'dialect': f'{get_engine().dialect.name}+{get_engine().dialect.driver}',
+            'samples': args.samples,
+        },
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    return report
+
+
+if __name__ == '__main__':
+    main()
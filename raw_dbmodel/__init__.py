@@ -1,2 +1,6 @@
 from .database import create_tables as create_tables  # noqa
 from .repository import Repository as Repository  # noqa
+from .repository import AsyncRepository as AsyncRepository  # noqa
+from ._session import unit_of_work as unit_of_work  # noqa
+from ._session import async_unit_of_work as async_unit_of_work  # noqa
+from ._replicas import use_primary as use_primary  # noqa
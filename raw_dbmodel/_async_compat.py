@@ -0,0 +1,286 @@
+from functools import wraps
+from logging import DEBUG
+from typing import (TYPE_CHECKING, Callable, Type, Optional, Union, Any, List, Dict, AsyncIterator, Awaitable, Tuple,
+                    AsyncContextManager, Iterable)
+
+from sqlalchemy import CursorResult, Executable, RowMapping, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from typing_extensions import Generic
+
+from raw_dbmodel._abstracts import RepositoryAbstract
+from raw_dbmodel._hydration import get_converter, hydrate_all
+from raw_dbmodel._metadata import describe
+from raw_dbmodel._pagination import DEFAULT_PAGE_SIZE, Page
+from raw_dbmodel._query import AsyncQuery
+from raw_dbmodel._rows import ProjectedRow, row_class
+from raw_dbmodel._session import get_async_connection, get_identity_map, discard_identities, async_unit_of_work
+from raw_dbmodel._bulk import chunked
+from raw_dbmodel._statements import in_statement, update_statement, delete_statement
+from raw_dbmodel._types import _T, TypeMode, DictOrStr, ListStrOrNone, Metrics
+from raw_dbmodel.database import get_async_engine
+from raw_dbmodel.exceptions import ModeOperatorError, ParameterTypeError, DictOrStrType, ListStrOrNoneType
+from raw_dbmodel.instrumentation import count_rows
+from raw_dbmodel.logger import sql_logger
+from raw_dbmodel.utils import DEFAULT_BATCH_SIZE, DotDict, is_dict_or_str, is_list_str_or_none, import_optional
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+
+class AsyncRepositoryBase(Generic[_T], RepositoryAbstract):
+    """
+    Awaitable counterpart of RepositoryBase built on the async engine
+    """
+
+    def __init__(self) -> None:
+        self.__engine: Optional[AsyncEngine] = None
+
+        self.__model: Optional[Type[_T]] = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self.__engine is None:
+            self.__engine = get_async_engine()
+
+        return self.__engine
+
+    @staticmethod
+    def transaction(func: Callable[..., Awaitable[Union['DataFrame', CursorResult[Any]]]]):
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            connection = get_async_connection()
+
+            if connection is not None:
+                return await func(self, connection, *args, **kwargs)
+
+            async with self.engine.begin() as connection:
+                return await func(self, connection, *args, **kwargs)
+
+        return wrapper
+
+    def session(self, *, savepoint: bool = False,
+                identity_map: bool = False) -> AsyncContextManager[AsyncConnection]:
+        return async_unit_of_work(self.engine, savepoint=savepoint, identity_map=identity_map)
+
+    @property
+    def model(self) -> Type[_T]:
+
+        if self.__model is None:
+            raise NotImplementedError(
+                "You should implement the model property in the subclass")
+
+        return self.__model
+
+    @model.setter
+    def model(self, value: Type[_T]):
+        self.__model = value
+
+    @transaction
+    async def __execute(self, connection: Optional[AsyncConnection], /, statement: Union[str, Executable],
+                        parameters: Optional[Union[List[Dict[str, Any]], Dict[str, Any]]] = None, *,
+                        mode: TypeMode = 'sql') -> \
+            Union['DataFrame', CursorResult[Any], Optional[RowMapping], List[Dict[str, Any]]]:
+        try:
+
+            if mode not in ('sql', 'as_pd', 'first', 'all', 'rows'):
+                raise ModeOperatorError(
+                    'Mode not is \'sql\', \'as_pd\', \'first\', \'all\' or \'rows\'')
+
+            if isinstance(statement, str):
+                statement = text(statement)
+
+            if sql_logger.isEnabledFor(DEBUG):
+                sql_logger.debug('%s %r', statement, parameters, extra={'markup': False})
+
+            result = await connection.execute(statement, parameters)
+
+            if mode == 'sql':
+                return result
+
+            if mode == 'first':
+                row = result.mappings().first()
+                count_rows(result, 0 if row is None else 1)
+
+                return row
+
+            rows = result.all()
+            count_rows(result, len(rows))
+
+            if mode == 'as_pd':
+                # what read_sql_query builds, from the rows fetched here
+                return import_optional('pandas').DataFrame.from_records(rows, columns=list(result.keys()),
+                                                                        coerce_float=True)
+
+            if mode == 'all':
+                return [dict(row._mapping) for row in rows]
+
+            return list(result.keys()), rows
+
+        except Exception:
+            raise
+
+    async def _read(self, statement: Executable, parameters: Optional[Dict[str, Any]] = None, *,
+                    mode: TypeMode) -> Union['DataFrame', Optional[RowMapping], List[Dict[str, Any]]]:
+        return await self.__execute(statement, parameters, mode=mode)
+
+    async def _stream(self, statement: Executable, parameters: Optional[Dict[str, Any]] = None, *,
+                      batch_size: int = DEFAULT_BATCH_SIZE, as_dict: bool = False,
+                      validate: bool = False,
+                      projection: bool = False) -> AsyncIterator[Union[_T, DotDict, ProjectedRow]]:
+
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError('The batch size must be an integer greater than 0')
+
+        async def read(connection: AsyncConnection) -> AsyncIterator[Union[_T, DotDict, ProjectedRow]]:
+            if sql_logger.isEnabledFor(DEBUG):
+                sql_logger.debug('%s %r', statement, parameters, extra={'markup': False})
+
+            result = await connection.stream(statement, parameters, execution_options={'yield_per': batch_size})
+
+            if projection and not as_dict:
+                cls = row_class(self.model, tuple(result.keys()))
+
+                async for partition in result.partitions(batch_size):
+                    count_rows(result, len(partition))
+
+                    for row in partition:
+                        yield cls(row)
+                return
+
+            convert = DotDict if as_dict else get_converter(self.model, tuple(result.keys()), validate)
+
+            async for partition in result.mappings().partitions(batch_size):
+                count_rows(result, len(partition))
+
+                for row in partition:
+                    yield convert(row)
+
+        connection = get_async_connection()
+
+        if connection is not None:
+            async for row in read(connection):
+                yield row
+            return
+
+        async with self.engine.connect() as connection:
+            async for row in read(connection):
+                yield row
+
+    def query(self) -> AsyncQuery[_T]:
+        return AsyncQuery(self)
+
+    def fields(self, fields: str) -> AsyncQuery[_T]:
+        return self.query().select(fields)
+
+    async def insert(self, model: Type[_T], *, have_autoincrement_default: bool = True) -> _T:
+        descriptor = describe(type(model))
+        model_dict = descriptor.values(model, have_autoincrement_default)
+        _sql = descriptor.insert_statement(descriptor.insert_columns(have_autoincrement_default))
+
+        await self.__execute(_sql, model_dict)
+        discard_identities(self.model)
+
+        return model
+
+    async def insert_all(self, *, models: List[Type[_T]], have_autoincrement_default: bool = True) -> bool:
+        descriptor = describe(self.model)
+        models = [descriptor.values(data, have_autoincrement_default) for data in models]
+        _sql = descriptor.table_insert
+
+        if not have_autoincrement_default:
+            _sql = descriptor.insert_statement(descriptor.columns_without_key)
+
+        result = await self.__execute(_sql, models)
+        discard_identities(self.model)
+
+        return bool(result.rowcount)
+
+    def get_data(self) -> AsyncQuery[_T]:
+        return self.query()
+
+    async def get_all(self, *, validate: bool = False) -> List[_T]:
+        return [model async for model in self.iter_all(validate=validate)]
+
+    def iter_all(self, *, batch_size: int = DEFAULT_BATCH_SIZE, as_dict: bool = False,
+                 validate: bool = False) -> AsyncIterator[Union[_T, DotDict]]:
+        return self.query().stream(batch_size=batch_size, as_dict=as_dict, validate=validate)
+
+    def get_one(self, where: DictOrStr,
+                operators: ListStrOrNone = None) -> AsyncQuery[_T]:
+        return self.query().get_one(where, operators)
+
+    async def get_many(self, ids: Iterable[Any], *, chunk_size: int = DEFAULT_BATCH_SIZE,
+                       validate: bool = False) -> List[Optional[_T]]:
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError('The chunk size must be an integer greater than 0')
+
+        ids = list(ids)
+        column = describe(self.model).primary_key_column
+        identities = get_identity_map()
+        found = {}
+
+        if identities is not None:
+            found = {_id: identities[(self.model, _id)] for _id in ids if (self.model, _id) in identities}
+
+        missing = [_id for _id in dict.fromkeys(ids) if _id not in found]
+        _sql = in_statement(self.model, column)
+
+        for chunk in chunked(missing, chunk_size):
+            for model in hydrate_all(self.model, await self.__execute(_sql, {'ids': tuple(chunk)}, mode='all'),
+                                     validate):
+                found[getattr(model, column)] = model
+
+                if identities is not None:
+                    identities[(self.model, getattr(model, column))] = model
+
+        return [found.get(_id) for _id in ids]
+
+    async def paginate(self, order_by: Optional[Union[str, Tuple[str, ...]]] = None,
+                       page_size: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None, *,
+                       as_dict: bool = False, validate: bool = False) -> Page:
+        return await self.query().paginate(order_by, page_size, after, as_dict=as_dict, validate=validate)
+
+    async def count(self, where: Optional[DictOrStr] = None, operators: ListStrOrNone = None) -> int:
+        return await self.query().where(where, operators).count()
+
+    async def exists(self, where: Optional[DictOrStr] = None, operators: ListStrOrNone = None) -> bool:
+        return await self.query().where(where, operators).exists()
+
+    async def aggregate(self, metrics: Metrics, *, group_by: Union[str, Tuple[str, ...]] = (),
+                        where: Optional[DictOrStr] = None, operators: ListStrOrNone = None,
+                        as_df: bool = False) -> Union[List[DotDict], 'DataFrame']:
+        return await self.query().where(where, operators).aggregate(metrics, group_by, as_df=as_df)
+
+    async def update(self, set_fields: DictOrStr, where: DictOrStr,
+                     operators: ListStrOrNone = None) -> bool:
+
+        if not is_dict_or_str(set_fields):
+            raise ParameterTypeError(DictOrStrType)
+
+        if not is_dict_or_str(where):
+            raise ParameterTypeError(DictOrStrType)
+
+        if not is_list_str_or_none(operators):
+            raise ParameterTypeError(ListStrOrNoneType)
+
+        _sql, _parameters = update_statement(self.model, set_fields, where, operators)
+
+        result = await self.__execute(_sql, _parameters)
+        discard_identities(self.model)
+
+        return bool(result.rowcount)
+
+    async def delete(self, where: DictOrStr, operators: ListStrOrNone = None) -> bool:
+
+        if not is_dict_or_str(where):
+            raise ParameterTypeError(DictOrStrType)
+
+        if not is_list_str_or_none(operators):
+            raise ParameterTypeError(ListStrOrNoneType)
+
+        _sql, _parameters = delete_statement(self.model, where, operators)
+
+        result = await self.__execute(_sql, _parameters)
+        discard_identities(self.model)
+
+        return bool(result.rowcount)
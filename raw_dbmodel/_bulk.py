@@ -0,0 +1,238 @@
+import io
+import json
+from datetime import date, datetime, time
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple
+
+from sqlalchemy import Connection
+
+from raw_dbmodel._statements import statement_cache
+from raw_dbmodel.utils import import_optional
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+__all__ = ("BulkLoadResult", "UpsertResult", "COPY_DRIVERS", "chunked", "frame_chunks", "value_rows", "encode_csv",
+           "copy_rows", "insert_rows", "upsert_rows")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(__all__))
+
+
+# drivers exposing COPY ... FROM STDIN on the dbapi cursor
+COPY_DRIVERS = ('psycopg2', 'psycopg2cffi', 'psycopg')
+
+# lowest bind parameter limit of the supported backends (SQLite), MySQL allows 65535
+MAX_PARAMETERS = 32766
+
+
+class BulkLoadResult(NamedTuple):
+    rows: int
+    seconds: float
+    rows_per_second: float
+
+
+class UpsertResult(NamedTuple):
+    inserted: int
+    updated: int
+
+
+def chunked(rows: Iterable[Sequence[Any]], size: int) -> Iterator[List[Sequence[Any]]]:
+    iterator = iter(rows)
+
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def frame_chunks(frame: 'DataFrame', size: int) -> Iterator[List[Sequence[Any]]]:
+    pd = import_optional('pandas')
+    datetime_columns = [column for column, dtype in frame.dtypes.items() if pd.api.types.is_datetime64_any_dtype(dtype)]
+
+    for start in range(0, len(frame), size):
+        chunk = frame.iloc[start:start + size].astype(object)
+        # NaN / NaT must reach the database as NULL
+        chunk = chunk.where(chunk.notna(), None)
+
+        # drivers bind datetime, not pandas Timestamp
+        for column in datetime_columns:
+            chunk[column] = pd.Series([None if value is None else value.to_pydatetime() for value in chunk[column]],
+                                      index=chunk.index, dtype=object)
+
+        yield list(chunk.itertuples(index=False, name=None))
+
+
+def value_rows(rows: Iterable[Any], columns: Tuple[str, ...],
+               model_row: Callable[[Any, Tuple[str, ...]], Tuple[Any, ...]]) -> Tuple[Tuple[str, ...], Iterator[Tuple]]:
+    """
+    The columns to write and the rows as tuples of their values. When the
+    first row is a dict only its keys are written, as for a DataFrame, so
+    the columns left out take their database default instead of NULL, and
+    every other dict row must have the same columns.
+    """
+    iterator = iter(rows)
+    first = next(iterator, None)
+    candidates = columns
+
+    if isinstance(first, dict):
+        columns = tuple(column for column in candidates if column in first)
+
+    def values() -> Iterator[Tuple]:
+        for row in chain(() if first is None else (first,), iterator):
+            if not isinstance(row, dict):
+                yield model_row(row, columns)
+                continue
+
+            if tuple(column for column in candidates if column in row) != columns:
+                raise ValueError(f'Every dict row must have the columns {", ".join(columns)}, '
+                                 f'not {", ".join(column for column in candidates if column in row)}')
+
+            yield tuple(row[column] for column in columns)
+
+    return columns, values()
+
+
+def _csv_field(value: Any) -> str:
+    # unquoted empty field is NULL for COPY, a quoted one is an empty string
+    if value is None:
+        return ''
+
+    if isinstance(value, (datetime, date, time)):
+        value = value.isoformat()
+
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def encode_csv(rows: Iterable[Sequence[Any]]) -> io.StringIO:
+    buffer = io.StringIO()
+
+    for row in rows:
+        buffer.write(','.join(_csv_field(value) for value in row))
+        buffer.write('\n')
+
+    buffer.seek(0)
+
+    return buffer
+
+
+def copy_rows(connection: Connection, table: str, columns: Sequence[str],
+              chunks: Iterable[List[Sequence[Any]]]) -> int:
+    total = 0
+    dbapi_connection = connection.connection.dbapi_connection
+
+    with dbapi_connection.cursor() as cursor:
+        if connection.dialect.driver == 'psycopg':
+            with cursor.copy(f"copy {table} ({', '.join(columns)}) from stdin") as copy:
+                for chunk in chunks:
+                    for row in chunk:
+                        copy.write_row(row)
+                    total += len(chunk)
+
+            return total
+
+        _sql = f"copy {table} ({', '.join(columns)}) from stdin with (format csv)"
+
+        for chunk in chunks:
+            cursor.copy_expert(_sql, encode_csv(chunk))
+            total += len(chunk)
+
+    return total
+
+
+def values_clause(columns: Sequence[str], size: int) -> str:
+    return ', '.join(f"({', '.join(f':p{row}_{index}' for index in range(len(columns)))})" for row in range(size))
+
+
+def row_parameters(rows: Sequence[Sequence[Any]]) -> Dict[str, Any]:
+    return {f"p{row}_{index}": value for row, values in enumerate(rows) for index, value in enumerate(values)}
+
+
+def insert_rows(connection: Connection, table: str, columns: Sequence[str],
+                chunks: Iterable[List[Sequence[Any]]]) -> int:
+    total = 0
+    rows_per_statement = max(1, MAX_PARAMETERS // max(1, len(columns)))
+
+    for chunk in chunks:
+        for start in range(0, len(chunk), rows_per_statement):
+            rows = chunk[start:start + rows_per_statement]
+            _sql = statement_cache.get(
+                (table, 'insert_values', tuple(columns), len(rows)),
+                lambda: f"insert into {table} ({', '.join(columns)}) values {values_clause(columns, len(rows))}")
+
+            connection.execute(_sql, row_parameters(rows))
+
+        total += len(chunk)
+
+    return total
+
+
+def upsert_sql(dialect: str, table: str, columns: Sequence[str], conflict_columns: Sequence[str],
+               update_columns: Sequence[str], size: int) -> str:
+    _sql = f"insert into {table} ({', '.join(columns)}) values {values_clause(columns, size)}"
+
+    if dialect in ('mysql', 'mariadb'):
+        # the conflict target of mysql is any primary key or unique index
+        _set = ', '.join(f'{column} = values({column})' for column in update_columns)
+
+        return f"{_sql} on duplicate key update {_set}"
+
+    if dialect not in ('postgresql', 'sqlite'):
+        raise NotImplementedError(f'Upsert is not supported on {dialect}')
+
+    _sql += f" on conflict ({', '.join(conflict_columns)}) do update set " \
+            f"{', '.join(f'{column} = excluded.{column}' for column in update_columns)}"
+
+    # xmax is 0 on the rows just inserted
+    return f"{_sql} returning (xmax = 0) as inserted" if dialect == 'postgresql' else _sql
+
+
+def upsert_rows(connection: Connection, table: str, columns: Sequence[str], conflict_columns: Sequence[str],
+                update_columns: Sequence[str], chunks: Iterable[List[Sequence[Any]]]) -> Tuple[int, int]:
+    dialect = connection.dialect.name
+    positions = [columns.index(column) for column in conflict_columns]
+    rows_per_statement = max(1, MAX_PARAMETERS // max(1, len(columns)))
+    inserted = updated = 0
+
+    for chunk in chunks:
+        # a statement can not affect one row twice, the last row of a key wins
+        chunk = list({tuple(row[position] for position in positions): row for row in chunk}.values())
+
+        for start in range(0, len(chunk), rows_per_statement):
+            rows = chunk[start:start + rows_per_statement]
+            parameters = row_parameters(rows)
+            _sql = statement_cache.get(
+                (table, 'upsert', dialect, tuple(columns), tuple(conflict_columns), tuple(update_columns), len(rows)),
+                lambda: upsert_sql(dialect, table, columns, conflict_columns, update_columns, len(rows)))
+
+            if dialect == 'sqlite':
+                # sqlite reports every row as changed, count the keys already stored first
+                _keys = ', '.join(f"({', '.join(f':p{row}_{index}' for index in positions)})"
+                                  for row in range(len(rows)))
+                existing = connection.execute(
+                    statement_cache.get(
+                        (table, 'upsert_existing', tuple(conflict_columns), tuple(positions), len(rows)),
+                        lambda: f"select count(*) from {table} "
+                                f"where ({', '.join(conflict_columns)}) in (values {_keys})"),
+                    parameters).scalar_one()
+                connection.execute(_sql, parameters)
+                inserted += len(rows) - existing
+                updated += existing
+                continue
+
+            result = connection.execute(_sql, parameters)
+
+            if dialect == 'postgresql':
+                flags = result.scalars().all()
+                inserted += sum(1 for flag in flags if flag)
+                updated += sum(1 for flag in flags if not flag)
+                continue
+
+            # with CLIENT_FOUND_ROWS, set by sqlalchemy, an updated row counts twice and a row
+            # already holding the same values once, so those are reported as inserted
+            updated += result.rowcount - len(rows)
+            inserted += 2 * len(rows) - result.rowcount
+
+    return inserted, updated
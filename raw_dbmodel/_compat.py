@@ -1,115 +1,93 @@
-from datetime import datetime
 from functools import wraps
-from typing import (Callable, Type, Optional, Union, Any, List, Dict)
+from logging import DEBUG, getLogger
+from time import perf_counter
+from typing import (TYPE_CHECKING, Callable, Type, Optional, Union, Any, List, Dict, Iterator, Tuple, Sequence,
+                    Iterable, ContextManager)
 
-import pandas as pd
-import sqlalchemy.sql
-from pandas import DataFrame
-from sqlalchemy import Connection, CursorResult, text
-from sqlmodel import inspect
+from sqlalchemy import Connection, CursorResult, Engine, Executable, Row, RowMapping, TextClause, text
 from typing_extensions import Generic
 
 from raw_dbmodel._abstracts import RepositoryAbstract
-from raw_dbmodel._types import _T, TypeMode, DictOrStr, ListStrOrNone
-from raw_dbmodel.database import engine as engine
+from raw_dbmodel._bulk import (BulkLoadResult, UpsertResult, COPY_DRIVERS, chunked, frame_chunks, value_rows,
+                               copy_rows, insert_rows, upsert_rows)
+from raw_dbmodel._hydration import get_converter, hydrate_all
+from raw_dbmodel._metadata import describe
+from raw_dbmodel._pagination import DEFAULT_PAGE_SIZE, Page
+from raw_dbmodel._query import Query
+from raw_dbmodel._replicas import ReplicaSet, stick_to_primary
+from raw_dbmodel._rows import ProjectedRow, row_class
+from raw_dbmodel._session import get_connection, get_identity_map, discard_identities, after_commit, unit_of_work
+from raw_dbmodel._statements import (CacheInfo, statement_cache, in_statement, update_statement, delete_statement,
+                                     delete_in_statement)
+from raw_dbmodel._types import _T, TypeMode, DictOrStr, ListStrOrNone, DtypeBackend, Metrics
+from raw_dbmodel.batch import QueryOrCallable, gather
+from raw_dbmodel.cache import CacheBackend, CacheStats, MISSING
+from raw_dbmodel.database import connect, connect_read, get_engine, get_replicas
 from raw_dbmodel.exceptions import ModeOperatorError, ParameterTypeError, DictOrStrType, ListStrOrNoneType
-from raw_dbmodel.utils import is_dict_or_str, is_list_str_or_none
+from raw_dbmodel.instrumentation import count_rows
+from raw_dbmodel.logger import sql_logger
+from raw_dbmodel.utils import (DEFAULT_BATCH_SIZE, DotDict, is_dataframe, is_dict_or_str, is_list_str_or_none,
+                               import_optional)
 
+if TYPE_CHECKING:
+    from pandas import DataFrame
 
-class DotDict(dict):
-    """
-    class to map the data in dictionary and access it through the dot
-    """
-
-    def __getattr__(self, key):
-
-        try:
-            return self[key]
-        except KeyError:
-            raise AttributeError(f"'Object has no attribute '{key}'")
-
-    def __setattr__(self, key, value):
-        self[key] = value
-
-    def __delattr__(self, key):
-        try:
-            del self[key]
-        except KeyError:
-            raise AttributeError(f"'Object has no attribute '{key}'")
+logger = getLogger(__name__)
 
 
 class RepositoryBase(Generic[_T], RepositoryAbstract):
+    # opt-in result cache, e.g. cache = InMemoryCache(maxsize=1024, ttl=60) in the subclass
+    cache: Optional[CacheBackend] = None
 
     def __init__(self) -> None:
-
-        try:
-            if engine is None:
-                raise Exception('Engine not could None')
-
-            self.__engine = engine
-        except Exception:
-            raise
+        self.__engine: Optional[Engine] = None
+        self.__replicas: Optional[ReplicaSet] = None
 
         self.__model: Optional[Type[_T]] = None
-        self.__fields = "*"
-        self.__query = ""
 
     @staticmethod
-    def transaction(func: Callable[..., Union[DataFrame, CursorResult[Any]]]):
+    def transaction(func: Callable[..., Union['DataFrame', CursorResult[Any]]]):
         @wraps(func)
         def wrapper(self, *args, **kwargs):
-            with engine.begin() as connection:
+            connection = get_connection()
+
+            # inside a unit of work the pinned connection is reused and committed by it
+            if connection is not None:
                 return func(self, connection, *args, **kwargs)
 
-        return wrapper
+            with connect(self.engine, begin=True) as connection:
+                return func(self, connection, *args, **kwargs)
 
-    @classmethod
-    def __get_value_formated(cls, value: str, separator: str):
-        new_value = ''
-        if isinstance(value, str):
-            new_value = f"'{value}'{separator}"
-        if isinstance(value, int):
-            new_value = f"{value}{separator}"
-        if isinstance(value, float):
-            new_value = f"{value}{separator}"
-        if isinstance(value, bool):
-            new_value = f"{value}{separator}"
-        if isinstance(value, datetime):
-            new_value = f"'{value.isoformat()}'{separator}"
-        if value is None:
-            new_value = f"{sqlalchemy.sql.null()}{separator}"
-
-        return new_value
-
-    @classmethod
-    def __get_where_conditions(cls, where: DictOrStr,
-                               operators: ListStrOrNone = None):
+        return wrapper
 
-        if not is_dict_or_str(where):
-            raise ParameterTypeError(DictOrStrType)
+    @property
+    def engine(self) -> Engine:
+        if self.__engine is None:
+            self.__engine = get_engine()
 
-        if not is_list_str_or_none(operators):
-            raise ParameterTypeError(ListStrOrNoneType)
+        return self.__engine
 
-        if isinstance(where, str):
-            return where
+    @property
+    def replicas(self) -> ReplicaSet:
+        # reads outside a unit of work are balanced across them, writes go to the engine
+        if self.__replicas is None:
+            self.__replicas = get_replicas()
 
-        if isinstance(where, dict):
-            _where = ''
+        return self.__replicas
 
-            for index, (field, value) in enumerate(where.items()):
-                separator = ' and '
-                _where += f"{field} = "
+    @replicas.setter
+    def replicas(self, value: ReplicaSet):
+        self.__replicas = value
 
-                if operators is not None:
-                    if index < len(operators):
-                        separator = f' {operators[index]} '
+    def session(self, *, savepoint: bool = False, identity_map: bool = False) -> ContextManager[Connection]:
+        return unit_of_work(self.engine, savepoint=savepoint, identity_map=identity_map)
 
-                if index == len(where.values()) - 1:
-                    separator = ' '
+    @staticmethod
+    def statement_cache_info() -> CacheInfo:
+        return statement_cache.info()
 
-                _where += cls.__get_value_formated(value, separator)
-            return _where
+    def cache_stats(self) -> Optional[CacheStats]:
+        return None if self.cache is None else self.cache.stats()
 
     @property
     def model(self) -> Type[_T]:
@@ -124,62 +102,192 @@ class RepositoryBase(Generic[_T], RepositoryAbstract):
     def model(self, value: Type[_T]):
         self.__model = value
 
+    @staticmethod
+    def __run(connection: Connection, statement: Union[str, Executable],
+              parameters: Optional[Union[List[Dict[str, Any]], Dict[str, Any]]] = None, *,
+              mode: TypeMode = 'sql') -> \
+            Union['DataFrame', CursorResult[Any], Optional[RowMapping], List[Dict[str, Any]]]:
+
+        if mode not in ('sql', 'as_pd', 'first', 'all', 'rows'):
+            raise ModeOperatorError(
+                'Mode not is \'sql\', \'as_pd\', \'first\', \'all\' or \'rows\'')
+
+        if isinstance(statement, str):
+            statement = text(statement)
+
+        if sql_logger.isEnabledFor(DEBUG):
+            sql_logger.debug('%s %r', statement, parameters, extra={'markup': False})
+
+        result = connection.execute(statement, parameters)
+
+        if mode == 'sql':
+            return result
+
+        if mode == 'first':
+            row = result.mappings().first()
+            count_rows(result, 0 if row is None else 1)
+
+            return row
+
+        rows = result.all()
+        count_rows(result, len(rows))
+
+        if mode == 'as_pd':
+            # what read_sql_query builds, from the rows fetched here
+            return import_optional('pandas').DataFrame.from_records(rows, columns=list(result.keys()),
+                                                                    coerce_float=True)
+
+        if mode == 'all':
+            return [dict(row._mapping) for row in rows]
+
+        # the column names and the rows as fetched, no dict per row
+        return list(result.keys()), rows
+
     @transaction
-    def __execute(self, connection: Optional[Connection], /, statement: Union[str, Type[_T]],
-                  parameters: Optional[Union[List[Type[_T]], Dict[str, Any]]] = None, *,
+    def __execute(self, connection: Optional[Connection], /, statement: Union[str, Executable],
+                  parameters: Optional[Union[List[Dict[str, Any]], Dict[str, Any]]] = None, *,
                   mode: TypeMode = 'sql') -> \
-            DataFrame | CursorResult[Any]:
+            Union['DataFrame', CursorResult[Any], Optional[RowMapping], List[Dict[str, Any]]]:
+        return self.__run(connection, statement, parameters, mode=mode)
+
+    def __execute_read(self, statement: Union[str, Executable], parameters: Optional[Dict[str, Any]] = None, *,
+                       mode: TypeMode) -> Union['DataFrame', Optional[RowMapping], List[Dict[str, Any]]]:
+        connection = get_connection()
+
+        # a unit of work is pinned to the primary, its reads see its own writes
+        if connection is not None:
+            return self.__run(connection, statement, parameters, mode=mode)
+
+        with connect_read(self.engine, self.replicas) as connection:
+            return self.__run(connection, statement, parameters, mode=mode)
+
+    def _read(self, statement: TextClause, parameters: Optional[Dict[str, Any]] = None, *,
+              mode: TypeMode) -> Union['DataFrame', Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+
+        # inside a unit of work the reads must see its own uncommitted writes
+        if self.cache is None or get_connection() is not None:
+            return self.__execute_read(statement, parameters, mode=mode)
+
+        key = (statement.text, tuple(sorted((parameters or {}).items())), mode)
+
         try:
+            hash(key)
+        except TypeError:
+            return self.__execute_read(statement, parameters, mode=mode)
 
-            if mode != 'sql' and mode != 'as_pd':
-                raise ModeOperatorError(
-                    'Mode not is \'sql\' or \'as_pd\'')
+        table = self.model.__tablename__
+        # read before the query, a write committed meanwhile changes it and the result is not kept
+        generation = self.cache.generation(table)
+        result = self.cache.get(key)
 
-            if mode == 'as_pd':
-                return pd.read_sql_query(text(statement), connection)
+        if result is MISSING:
+            result = self.__execute_read(statement, parameters, mode=mode)
 
-            if parameters is not None:
-                return connection.execute(statement, parameters)
+            if mode == 'first' and result is not None:
+                result = dict(result)
 
-            return connection.execute(text(statement))
+            if generation is None:
+                self.cache.set(key, result, table)
+            else:
+                self.cache.set(key, result, table, generation=generation)
 
-        except Exception:
-            raise
+        # the cached DataFrame must not be changed by the caller
+        return result.copy() if is_dataframe(result) else result
 
-    def fields(self, fields: str) -> 'RepositoryBase[_T]':
-        self.__fields = fields
+    def __invalidate(self) -> None:
+        discard_identities(self.model)
+        # inside a unit of work only once it commits, a concurrent read would
+        # otherwise cache the old rows again before the other threads see the write
+        after_commit(stick_to_primary, self.replicas.read_your_writes)
 
-        return self
+        if self.cache is not None:
+            after_commit(self.cache.invalidate, self.model.__tablename__)
 
-    def insert(self, model: Type[_T], *, have_autoincrement_default: bool = True) -> _T:
-        model_dict: dict = model.model_dump()
+    def __partitions(self, statement: Executable, parameters: Optional[Dict[str, Any]] = None, *,
+                     batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Tuple[List[str], Sequence[Row]]]:
+
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError('The batch size must be an integer greater than 0')
+
+        def read(connection: Connection) -> Iterator[Tuple[List[str], Sequence[Row]]]:
+            if sql_logger.isEnabledFor(DEBUG):
+                sql_logger.debug('%s %r', statement, parameters, extra={'markup': False})
+
+            result = connection.execute(statement, parameters, execution_options={
+                'stream_results': True, 'yield_per': batch_size})
+            columns = list(result.keys())
+
+            for partition in result.partitions(batch_size):
+                count_rows(result, len(partition))
+                yield columns, partition
+
+        def partitions() -> Iterator[Tuple[List[str], Sequence[Row]]]:
+            connection = get_connection()
+
+            if connection is not None:
+                yield from read(connection)
+                return
+
+            # The connection stays checked out while the generator is alive, rows are
+            # fetched from a server side cursor batch_size at a time
+            with connect_read(self.engine, self.replicas) as connection:
+                yield from read(connection)
+
+        return partitions()
+
+    def _stream(self, statement: Executable, parameters: Optional[Dict[str, Any]] = None, *,
+                batch_size: int = DEFAULT_BATCH_SIZE, as_dict: bool = False,
+                validate: bool = False, projection: bool = False) -> Iterator[Union[_T, DotDict, ProjectedRow]]:
+        partitions = self.__partitions(statement, parameters, batch_size=batch_size)
+
+        def rows() -> Iterator[Union[_T, DotDict, ProjectedRow]]:
+            for columns, partition in partitions:
+                if projection and not as_dict:
+                    yield from map(row_class(self.model, tuple(columns)), partition)
+                    continue
+
+                convert = DotDict if as_dict else get_converter(self.model, tuple(columns), validate)
+
+                for row in partition:
+                    yield convert(row._mapping)
+
+        return rows()
+
+    def _arrow_tables(self, statement: Executable, parameters: Optional[Dict[str, Any]] = None, *,
+                      batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Any]:
+        pa = import_optional('pyarrow')
+        partitions = self.__partitions(statement, parameters, batch_size=batch_size)
 
-        if not have_autoincrement_default:
-            table = inspect(self.model).tables[0]
-            columns_key = [column.name for column in table.primary_key.columns]
+        return (pa.Table.from_arrays([pa.array(values) for values in zip(*partition)], names=columns)
+                for columns, partition in partitions)
 
-            for field_key in columns_key:
-                for key in model_dict.keys():
-                    if field_key == key:
-                        model_dict.pop(field_key)
-                        break
+    def _frames(self, statement: Executable, parameters: Optional[Dict[str, Any]] = None, *,
+                chunksize: int = DEFAULT_BATCH_SIZE, dtype_backend: DtypeBackend = 'numpy') -> Iterator['DataFrame']:
+        pd = import_optional('pandas')
 
-        _columns = ', '.join(model_dict.keys())
-        _values = ''
-        field_values = model_dict.values()
+        if dtype_backend == 'pyarrow':
+            return (table.to_pandas(types_mapper=pd.ArrowDtype)
+                    for table in self._arrow_tables(statement, parameters, batch_size=chunksize))
 
-        for index, value in enumerate(field_values):
-            separator = ', '
+        partitions = self.__partitions(statement, parameters, batch_size=chunksize)
 
-            if index == len(field_values) - 1:
-                separator = ' '
+        return (pd.DataFrame.from_records(partition, columns=columns, coerce_float=True)
+                for columns, partition in partitions)
 
-            _values += self.__get_value_formated(value, separator)
+    def query(self) -> Query[_T]:
+        return Query(self)
 
-        _sql = f"insert into {model.__tablename__} ({_columns}) values ({_values});"
+    def fields(self, fields: str) -> Query[_T]:
+        return self.query().select(fields)
+
+    def insert(self, model: Type[_T], *, have_autoincrement_default: bool = True) -> _T:
+        descriptor = describe(type(model))
+        model_dict = descriptor.values(model, have_autoincrement_default)
+        _sql = descriptor.insert_statement(descriptor.insert_columns(have_autoincrement_default))
 
         try:
-            self.__execute(_sql)
+            self.__execute(_sql, model_dict)
+            self.__invalidate()
             return model
         except ModeOperatorError:
             raise
@@ -189,37 +297,105 @@ class RepositoryBase(Generic[_T], RepositoryAbstract):
     def insert_all(self, *, models: List[Type[_T]], have_autoincrement_default: bool = True) -> bool:
         try:
 
-            models = [{**data.model_dump()} for data in models]
-            _sql = self.model.__table__.insert()
+            descriptor = describe(self.model)
+            models = [descriptor.values(data, have_autoincrement_default) for data in models]
+            _sql = descriptor.table_insert
 
             if not have_autoincrement_default:
-                table = inspect(self.model).tables[0]
-                columns_key = [
-                    column.name for column in table.primary_key.columns]
-
-                for field_key in columns_key:
-                    for model in models:
-                        if field_key in model.keys():
-                            model.pop(field_key)
-                            continue
-
-                _columns = ', '.join(models[0].keys())
-                _values = ', '.join(f":{key}" for key in models[0].keys())
-
-                _sql = f"insert into {self.model.__tablename__} ({_columns}) values ({_values})"
+                _sql = descriptor.insert_statement(descriptor.columns_without_key)
 
             result = self.__execute(_sql, models)
+            self.__invalidate()
 
             return bool(result.rowcount)
         except Exception:
             raise
 
-    def get_data(self) -> 'RepositoryBase[_T]':
-        self.__query = f"select {self.__fields} from {self.model.__tablename__}"
+    @transaction
+    def __bulk_load(self, connection: Connection, /, columns: Sequence[str],
+                    chunks: Iterable[List[Sequence[Any]]]) -> int:
+
+        if connection.dialect.driver in COPY_DRIVERS:
+            return copy_rows(connection, self.model.__tablename__, columns, chunks)
+
+        return insert_rows(connection, self.model.__tablename__, columns, chunks)
 
-        return self
+    def bulk_load(self, data: Union['DataFrame', Iterable[Union[_T, Dict[str, Any]]]], *,
+                  chunk_size: int = DEFAULT_BATCH_SIZE, have_autoincrement_default: bool = True) -> BulkLoadResult:
 
-    def get_all(self, model: Optional[Type[_T]] = None) -> Optional[List[_T]]:
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError('The chunk size must be an integer greater than 0')
+
+        descriptor = describe(self.model)
+        columns = descriptor.insert_columns(have_autoincrement_default)
+
+        if is_dataframe(data):
+            columns = tuple(column for column in columns if column in data.columns)
+            chunks = frame_chunks(data[list(columns)], chunk_size)
+        else:
+            columns, rows = value_rows(data, columns, descriptor.row)
+            chunks = chunked(rows, chunk_size)
+
+        start = perf_counter()
+        rows_loaded = self.__bulk_load(columns, chunks)
+        seconds = perf_counter() - start
+        self.__invalidate()
+
+        result = BulkLoadResult(rows_loaded, seconds, rows_loaded / seconds if seconds > 0 else 0.0)
+        logger.info(f'{result.rows} rows loaded into [b blue]{self.model.__tablename__}[/b blue] '
+                    f'in {result.seconds:.2f}s ({result.rows_per_second:.0f} rows/s)')
+
+        return result
+
+    @transaction
+    def __upsert(self, connection: Connection, /, columns: Sequence[str], conflict_columns: Sequence[str],
+                 update_columns: Sequence[str], chunks: Iterable[List[Sequence[Any]]]) -> Tuple[int, int]:
+        return upsert_rows(connection, self.model.__tablename__, columns, conflict_columns, update_columns, chunks)
+
+    def upsert_all(self, models: Iterable[Union[_T, Dict[str, Any]]], *,
+                   conflict_columns: Optional[Sequence[str]] = None, update_columns: Optional[Sequence[str]] = None,
+                   chunk_size: int = DEFAULT_BATCH_SIZE) -> UpsertResult:
+        """
+        Insert the models, updating update_columns of the rows already stored
+        with the same conflict_columns (the primary key by default). Dict rows
+        write only their keys, update_columns defaults to the other ones. Rows
+        repeating a key in one chunk are sent once, the last one wins. Every
+        chunk is sent as one statement and all of them run in one transaction.
+        """
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError('The chunk size must be an integer greater than 0')
+
+        descriptor = describe(self.model)
+        conflict_columns = tuple(conflict_columns or descriptor.primary_key)
+        unknown = [column for column in (*conflict_columns, *(update_columns or ()))
+                   if column not in descriptor.columns]
+
+        if unknown:
+            raise ValueError(f'Unknown columns of {descriptor.tablename}: {", ".join(unknown)}')
+
+        # dict rows only write, and update, the columns they have
+        columns, rows = value_rows(models, descriptor.columns, descriptor.row)
+
+        if update_columns is None:
+            update_columns = tuple(column for column in columns if column not in conflict_columns)
+
+        missing = [column for column in (*conflict_columns, *update_columns) if column not in columns]
+
+        if missing:
+            raise ValueError(f'The rows have no value for {", ".join(missing)}')
+
+        if not update_columns:
+            raise ValueError('There must be at least one column to update')
+
+        inserted, updated = self.__upsert(columns, conflict_columns, update_columns, chunked(rows, chunk_size))
+        self.__invalidate()
+
+        return UpsertResult(inserted, updated)
+
+    def get_data(self) -> Query[_T]:
+        return self.query()
+
+    def get_all(self, model: Optional[Type[_T]] = None, *, validate: bool = False) -> Optional[List[_T]]:
 
         if model is not None:
             self.model = model
@@ -227,38 +403,73 @@ class RepositoryBase(Generic[_T], RepositoryAbstract):
         if self.model is None:
             raise Exception('Property model not implemented')
 
-        _sql = f"select * from {self.model.__tablename__}"
+        if self.cache is not None:
+            return self.query().all(validate=validate)
 
-        generic_models: List[Type[_T]] = []
-        models_from_db = self.__execute(_sql, mode='as_pd')
+        return list(self.iter_all(validate=validate))
 
-        list_model = models_from_db.to_dict('records')
+    def iter_all(self, *, batch_size: int = DEFAULT_BATCH_SIZE, as_dict: bool = False,
+                 validate: bool = False) -> Iterator[Union[_T, DotDict]]:
 
-        for model in list_model:
-            inherited_model = self.model(**model)
-            generic_models.append(inherited_model)
+        if self.model is None:
+            raise NotImplementedError('Property model not implemented')
 
-        return generic_models
+        return self.query().stream(batch_size=batch_size, as_dict=as_dict, validate=validate)
 
     def get_one(self, where: DictOrStr,
-                operators: ListStrOrNone = None) -> 'RepositoryBase[_T]':
+                operators: ListStrOrNone = None) -> Query[_T]:
+        return self.query().get_one(where, operators)
 
-        if not is_dict_or_str(where):
-            raise ParameterTypeError(DictOrStrType)
+    def gather(self, *queries: QueryOrCallable, return_exceptions: bool = False) -> List[Any]:
+        return gather(*queries, engine=self.engine, return_exceptions=return_exceptions)
 
-        if not is_list_str_or_none(operators):
-            raise ParameterTypeError(ListStrOrNoneType)
+    def get_many(self, ids: Iterable[Any], *, chunk_size: int = DEFAULT_BATCH_SIZE,
+                 validate: bool = False) -> List[Optional[_T]]:
+        """
+        Models of the given primary keys in the order of ids, None for the
+        keys not found. The keys are read chunk_size at a time with IN.
+        """
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError('The chunk size must be an integer greater than 0')
 
-        if self.model is None:
-            raise NotImplementedError('Property model not implemented')
+        ids = list(ids)
+        column = describe(self.model).primary_key_column
+        identities = get_identity_map()
+        found = {}
+
+        if identities is not None:
+            found = {_id: identities[(self.model, _id)] for _id in ids if (self.model, _id) in identities}
+
+        missing = [_id for _id in dict.fromkeys(ids) if _id not in found]
+        _sql = in_statement(self.model, column)
 
-        _where = self.__get_where_conditions(where, operators)
+        for chunk in chunked(missing, chunk_size):
+            for model in hydrate_all(self.model, self._read(_sql, {'ids': tuple(chunk)}, mode='all'), validate):
+                found[getattr(model, column)] = model
 
-        _sql = f"select {self.__fields} from {self.model.__tablename__} where {_where};"
+                if identities is not None:
+                    identities[(self.model, getattr(model, column))] = model
 
-        self.__query = _sql
+        return [found.get(_id) for _id in ids]
 
-        return self
+    def paginate(self, order_by: Optional[Union[str, Tuple[str, ...]]] = None, page_size: int = DEFAULT_PAGE_SIZE,
+                 after: Optional[str] = None, *, as_dict: bool = False, validate: bool = False) -> Page:
+        return self.query().paginate(order_by, page_size, after, as_dict=as_dict, validate=validate)
+
+    def count(self, where: Optional[DictOrStr] = None, operators: ListStrOrNone = None) -> int:
+        return self.query().where(where, operators).count()
+
+    def exists(self, where: Optional[DictOrStr] = None, operators: ListStrOrNone = None) -> bool:
+        return self.query().where(where, operators).exists()
+
+    def aggregate(self, metrics: Metrics, *, group_by: Union[str, Tuple[str, ...]] = (),
+                  where: Optional[DictOrStr] = None, operators: ListStrOrNone = None,
+                  as_df: bool = False) -> Union[List[DotDict], 'DataFrame']:
+        """
+        Aggregates computed by the database, e.g. metrics={'price': ['sum', 'avg'], '*': 'count'}
+        selects price_sum, price_avg and count, one row per group of group_by.
+        """
+        return self.query().where(where, operators).aggregate(metrics, group_by, as_df=as_df)
 
     def update(self, set_fields: DictOrStr, where: DictOrStr,
                operators: ListStrOrNone = None) -> bool:
@@ -272,82 +483,113 @@ class RepositoryBase(Generic[_T], RepositoryAbstract):
         if not is_list_str_or_none(operators):
             raise ParameterTypeError(ListStrOrNoneType)
 
-        _set = ''
-        _where = ''
-
         if self.model is None:
             raise NotImplementedError('Property model not implemented')
 
-        if isinstance(set_fields, str):
-            _set = set_fields
+        _sql, _parameters = update_statement(self.model, set_fields, where, operators)
 
-        if isinstance(set_fields, dict):
-            for index, (field, value) in enumerate(set_fields.items()):
-                _set += f"{field} = "
-                separator = ', '
+        result = self.__execute(_sql, _parameters)
+        self.__invalidate()
 
-                if index == (len(set_fields.values()) - 1):
-                    separator = ' '
+        return bool(result.rowcount)
 
-                _set += self.__get_value_formated(value, separator)
+    def __execute_batches(self, batches: Iterable[Tuple[TextClause, Union[Dict[str, Any], List[Dict[str, Any]]], int]],
+                          commit_every: Optional[int]) -> int:
+        connection = get_connection()
 
-        _where = self.__get_where_conditions(where, operators)
+        # the unit of work owns the transaction, it commits once at the end
+        if connection is not None:
+            return sum(self.__run(connection, statement, parameters).rowcount for statement, parameters, _ in batches)
 
-        _sql = f"update {self.model.__tablename__} set {_set} where {_where};"
+        total = pending = 0
 
-        result = self.__execute(_sql)
+        with connect(self.engine) as connection:
+            transaction = connection.begin()
 
-        return bool(result.rowcount)
+            try:
+                for statement, parameters, rows in batches:
+                    total += self.__run(connection, statement, parameters).rowcount
+                    pending += rows
 
-    def delete(self, where: DictOrStr, operators: ListStrOrNone = None) -> bool:
+                    if commit_every is not None and pending >= commit_every:
+                        transaction.commit()
+                        transaction = connection.begin()
+                        pending = 0
 
-        if not is_dict_or_str(where):
-            raise ParameterTypeError(DictOrStrType)
+                transaction.commit()
+            except Exception:
+                transaction.rollback()
+                raise
 
-        if not is_list_str_or_none(operators):
-            raise ParameterTypeError(ListStrOrNoneType)
+        return total
 
-        _where = ''
+    def update_many(self, changes: Iterable[Tuple[DictOrStr, DictOrStr]], *,
+                    commit_every: Optional[int] = None) -> int:
+        """
+        Apply every (set_fields, where) pair in order and return the number
+        of rows updated. Consecutive pairs of the same shape are sent together
+        with executemany. All of them are committed at once, or every
+        commit_every updates.
+        """
+        if commit_every is not None and (not isinstance(commit_every, int) or commit_every < 1):
+            raise ValueError('The commit interval must be an integer greater than 0')
 
-        _where = self.__get_where_conditions(where, operators)
+        # runs of consecutive pairs sharing one statement
+        runs: List[Tuple[TextClause, List[Dict[str, Any]]]] = []
 
-        _sql = f"delete from {self.model.__tablename__} where {_where}"
+        for set_fields, where in changes:
+            if not is_dict_or_str(set_fields):
+                raise ParameterTypeError(DictOrStrType)
 
-        result = self.__execute(_sql)
+            if not is_dict_or_str(where):
+                raise ParameterTypeError(DictOrStrType)
 
-        return bool(result.rowcount)
+            _sql, _parameters = update_statement(self.model, set_fields, where)
+
+            if runs and runs[-1][0].text == _sql.text:
+                runs[-1][1].append(_parameters)
+            else:
+                runs.append((_sql, [_parameters]))
+
+        step = commit_every or max((len(parameters) for _, parameters in runs), default=1)
+        batches = ((_sql, chunk, len(chunk)) for _sql, parameters in runs for chunk in chunked(parameters, step))
 
-    def as_model(self) -> Optional[_T]:
-        if self.__query != "":
-            model_found = self.__execute(self.__query, mode='as_pd')
+        total = self.__execute_batches(batches, commit_every)
+        self.__invalidate()
 
-            if model_found.empty:
-                return None
+        return total
 
-            model = model_found.to_dict('records')[0]
+    def delete_many(self, ids: Iterable[Any], *, chunk_size: int = DEFAULT_BATCH_SIZE,
+                    commit_every: Optional[int] = None) -> int:
+        """
+        Delete the rows of the given primary keys chunk_size at a time and
+        return the number of rows deleted.
+        """
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError('The chunk size must be an integer greater than 0')
 
-            return self.model(**model)
-        return None
+        if commit_every is not None and (not isinstance(commit_every, int) or commit_every < 1):
+            raise ValueError('The commit interval must be an integer greater than 0')
 
-    def as_dict(self) -> Optional[DotDict]:
-        if self.__query != "":
-            model_found = self.__execute(self.__query, mode='as_pd')
+        _sql = delete_in_statement(self.model, describe(self.model).primary_key_column)
+        batches = ((_sql, {'ids': tuple(chunk)}, len(chunk)) for chunk in chunked(dict.fromkeys(ids), chunk_size))
 
-            if model_found.empty:
-                return None
+        total = self.__execute_batches(batches, commit_every)
+        self.__invalidate()
 
-            model = model_found.to_dict('records')[0]
+        return total
 
-            return DotDict(model)
-        return None
+    def delete(self, where: DictOrStr, operators: ListStrOrNone = None) -> bool:
 
-    def as_df(self) -> Optional[DataFrame]:
-        if self.__query != "":
-            model_found = self.__execute(self.__query, mode='as_pd')
+        if not is_dict_or_str(where):
+            raise ParameterTypeError(DictOrStrType)
 
-            if model_found.empty:
-                return None
+        if not is_list_str_or_none(operators):
+            raise ParameterTypeError(ListStrOrNoneType)
+
+        _sql, _parameters = delete_statement(self.model, where, operators)
 
-            return model_found
+        result = self.__execute(_sql, _parameters)
+        self.__invalidate()
 
-        return None
+        return bool(result.rowcount)
@@ -0,0 +1,125 @@
+from datetime import date, datetime
+from functools import lru_cache, partial
+from typing import Any, Callable, List, Mapping, Optional, Sequence, Tuple, Type, Union, get_args, get_origin
+
+from sqlalchemy.orm import configure_mappers
+from sqlalchemy.orm.instrumentation import opt_manager_of_class
+
+from raw_dbmodel._types import _T
+
+__all__ = ("get_converter", "hydrate", "hydrate_all")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(__all__))
+
+
+def _none_if_nan(value: Any) -> Any:
+    # NaN / NaT are the only values not equal to themselves
+    return None if value != value else value
+
+
+def _to_datetime(value: Any) -> Any:
+    if value != value:
+        return None
+
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+
+    # pandas Timestamp
+    if hasattr(value, 'to_pydatetime'):
+        return value.to_pydatetime()
+
+    return value
+
+
+def _to_date(value: Any) -> Any:
+    if value != value:
+        return None
+
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            return value
+
+    if isinstance(value, datetime):
+        return value.date()
+
+    return value
+
+
+def _coercion(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    types = set(get_args(annotation)) - {type(None)} if get_origin(annotation) is Union else {annotation}
+
+    if datetime in types:
+        return _to_datetime
+
+    if date in types:
+        return _to_date
+
+    # a text column never holds NaN
+    if types == {str}:
+        return None
+
+    return _none_if_nan
+
+
+@lru_cache(maxsize=256)
+def get_converter(model: Type[_T], columns: Tuple[str, ...], validate: bool = False) -> Callable[[Mapping], _T]:
+    """
+    Row to model function for the rows of the given columns, built once per
+    model and columns. Without validation the values are only coerced
+    (Timestamp/ISO strings to datetime, NaN to None) and stored as the ORM
+    does when it loads a row, skipping __init__.
+    """
+    if validate:
+        return model.model_validate
+
+    fields = model.model_fields
+    plan = [(column, _coercion(fields[column].annotation)) for column in columns if column in fields]
+    defaults = [(name, field) for name, field in fields.items() if name not in columns and not field.is_required()]
+    fields_set = frozenset(column for column, _ in plan)
+    manager = opt_manager_of_class(model)
+
+    # __init__ would configure the mappers on the first instance, new_instance does not
+    if manager is not None:
+        configure_mappers()
+
+    new_instance = manager.new_instance if manager is not None else partial(model.__new__, model)
+    post_init = model.__pydantic_post_init__ is not None
+
+    def convert(row: Mapping) -> _T:
+        instance = new_instance()
+        values = instance.__dict__
+
+        for column, coerce in plan:
+            values[column] = row[column] if coerce is None else coerce(row[column])
+
+        for name, field in defaults:
+            values[name] = field.get_default(call_default_factory=True)
+
+        object.__setattr__(instance, '__pydantic_fields_set__', set(fields_set))
+
+        if post_init:
+            instance.model_post_init(None)
+
+        return instance
+
+    return convert
+
+
+def hydrate(model: Type[_T], row: Optional[Mapping], validate: bool = False) -> Optional[_T]:
+    return None if row is None else get_converter(model, tuple(row.keys()), validate)(row)
+
+
+def hydrate_all(model: Type[_T], rows: Sequence[Mapping], validate: bool = False) -> List[_T]:
+    if not rows:
+        return []
+
+    convert = get_converter(model, tuple(rows[0].keys()), validate)
+
+    return [convert(row) for row in rows]
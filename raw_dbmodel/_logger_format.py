@@ -1,4 +1,32 @@
+import json
 import logging
+import re
+from datetime import datetime, timezone
+
+# rich console markup such as [b blue]...[/b blue], printed as is by the plain formatters
+MARKUP = re.compile(r'\[/?(?:[a-z]+(?: [a-z]+)*)?\]')
+
+# attributes of every record, any other one was passed with extra=
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'markup'}
+
+
+def plain_message(record: logging.LogRecord) -> str:
+    message = record.getMessage()
+
+    if getattr(record, 'markup', True) is False:
+        return message
+
+    return MARKUP.sub('', message)
+
+
+class PlainFormatter(logging.Formatter):
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        # record.message was just set by format(), as logging.Formatter does
+        if getattr(record, 'markup', True) is not False:
+            record.message = MARKUP.sub('', record.message)
+
+        return super().formatMessage(record)
 
 
 class CustomFormatter(logging.Formatter):
@@ -22,9 +50,42 @@ class CustomFormatter(logging.Formatter):
             logging.ERROR: self.red + self.fmt + self.reset,
             logging.CRITICAL: self.bold_red + self.fmt + self.reset
         }
+        # built once, not for every record
+        self.__formatters = {level: PlainFormatter(fmt=log_fmt, datefmt=self.datefmt)
+                             for level, log_fmt in self.FORMATS.items()}
+        self.__default = PlainFormatter(fmt=self.fmt, datefmt=self.datefmt)
 
     def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno, self.fmt)
-        formatter = logging.Formatter(fmt=log_fmt, datefmt=self.datefmt)
+        return self.__formatters.get(record.levelno, self.__default).format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line with the time, level, logger, message and the
+    fields passed with extra=, for log collectors.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': plain_message(record),
+        }
+
+        if record.exc_info:
+            # cached on the record like logging.Formatter does
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+
+        for key, value in record.__dict__.items():
+            if key not in RECORD_ATTRIBUTES:
+                entry[key] = value
 
-        return formatter.format(record)
+        return json.dumps(entry, default=str, ensure_ascii=False)
@@ -0,0 +1,71 @@
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Dict, Tuple, Type
+
+from sqlalchemy import Insert, Table, TextClause, text
+from sqlmodel import SQLModel, inspect
+
+__all__ = ("ModelDescriptor", "describe")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(__all__))
+
+
+class ModelDescriptor:
+    """
+    What the write paths need to know about a table model, worked out once
+    per class: columns in table order, primary key and the insert statements
+    already built for every subset of columns used.
+    """
+
+    def __init__(self, model: Type[SQLModel]) -> None:
+        self.model = model
+        self.table: Table = inspect(model).tables[0]
+        self.tablename: str = self.table.name
+        self.columns: Tuple[str, ...] = tuple(column.name for column in self.table.columns)
+        self.primary_key: Tuple[str, ...] = tuple(column.name for column in self.table.primary_key.columns)
+        # inserted when the database does not generate the primary key
+        self.columns_without_key: Tuple[str, ...] = tuple(
+            column for column in self.columns if column not in self.primary_key)
+        self.table_insert: Insert = self.table.insert()
+        self.__inserts: Dict[Tuple[str, ...], TextClause] = {}
+        self.__lock = Lock()
+
+    @property
+    def primary_key_column(self) -> str:
+        if len(self.primary_key) != 1:
+            raise ValueError(f'{self.model.__name__} must have a primary key of a single column')
+
+        return self.primary_key[0]
+
+    def insert_columns(self, have_autoincrement_default: bool = True) -> Tuple[str, ...]:
+        return self.columns if have_autoincrement_default else self.columns_without_key
+
+    def values(self, model: SQLModel, have_autoincrement_default: bool = True) -> Dict[str, Any]:
+        # field values are read straight from the instance, no serialization is needed to bind them
+        values = model.__dict__
+
+        return {column: values.get(column) for column in self.insert_columns(have_autoincrement_default)}
+
+    def row(self, model: SQLModel, columns: Tuple[str, ...]) -> Tuple[Any, ...]:
+        values = model.__dict__
+
+        return tuple(values.get(column) for column in columns)
+
+    def insert_statement(self, columns: Tuple[str, ...]) -> TextClause:
+        statement = self.__inserts.get(columns)
+
+        if statement is None:
+            statement = text(f"insert into {self.tablename} ({', '.join(columns)}) "
+                             f"values ({', '.join(f':{column}' for column in columns)});")
+
+            with self.__lock:
+                statement = self.__inserts.setdefault(columns, statement)
+
+        return statement
+
+
+@lru_cache(maxsize=None)
+def describe(model: Type[SQLModel]) -> ModelDescriptor:
+    return ModelDescriptor(model)
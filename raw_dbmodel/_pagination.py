@@ -0,0 +1,91 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+__all__ = ("Page", "DEFAULT_PAGE_SIZE", "encode_cursor", "decode_cursor")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(__all__))
+
+
+DEFAULT_PAGE_SIZE = 100
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    # pass it as after= to read the next page, None on the last page
+    next_cursor: Optional[str]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+
+    if isinstance(value, date):
+        return {'$date': value.isoformat()}
+
+    if isinstance(value, time):
+        return {'$time': value.isoformat()}
+
+    if isinstance(value, Decimal):
+        return {'$decimal': str(value)}
+
+    if isinstance(value, UUID):
+        return {'$uuid': str(value)}
+
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {'$bytes': urlsafe_b64encode(bytes(value)).decode()}
+
+    # compared with the value stored in the column
+    if isinstance(value, Enum):
+        return value.value
+
+    raise TypeError(f'Can not use a value of type {type(value).__name__} in a page cursor')
+
+
+def _decode_value(value: Dict[str, Any]) -> Any:
+    if '$datetime' in value:
+        return datetime.fromisoformat(value['$datetime'])
+
+    if '$date' in value:
+        return date.fromisoformat(value['$date'])
+
+    if '$time' in value:
+        return time.fromisoformat(value['$time'])
+
+    if '$decimal' in value:
+        return Decimal(value['$decimal'])
+
+    if '$uuid' in value:
+        return UUID(value['$uuid'])
+
+    if '$bytes' in value:
+        return urlsafe_b64decode(value['$bytes'])
+
+    return value
+
+
+def encode_cursor(order_by: Tuple[str, ...], values: Tuple[Any, ...]) -> str:
+    payload = json.dumps([list(order_by), list(values)], default=_encode_value, separators=(',', ':'))
+
+    return urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, order_by: Tuple[str, ...]) -> Tuple[Any, ...]:
+    try:
+        payload = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_order, values = json.loads(payload, object_hook=_decode_value)
+    except (BinasciiError, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError('The page cursor is not valid')
+
+    # a cursor is only meaningful for the ordering that produced it
+    if tuple(cursor_order) != order_by or len(values) != len(order_by):
+        raise ValueError('The page cursor was created for another ordering')
+
+    return tuple(values)
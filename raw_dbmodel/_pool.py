@@ -0,0 +1,75 @@
+from threading import Lock
+from typing import NamedTuple, Optional
+
+from sqlalchemy import Engine, QueuePool
+
+__all__ = ("PoolMetrics", "PoolStats")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(__all__))
+
+
+class PoolStats(NamedTuple):
+    size: int
+    checked_out: int
+    overflow: int
+    capacity: Optional[int]
+    saturation: Optional[float]
+    checkouts: int
+    timeouts: int
+    average_wait: float
+    max_wait: float
+
+
+class PoolMetrics:
+    """
+    Time spent waiting for a pooled connection, recorded around every checkout
+    made by the repositories.
+    """
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.__lock = Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self.__lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def observe_timeout(self) -> None:
+        with self.__lock:
+            self.timeouts += 1
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+    def snapshot(self, engine: Engine) -> PoolStats:
+        pool = engine.pool
+        size = checked_out = overflow = 0
+        capacity = saturation = None
+
+        # NullPool and friends have no fixed capacity to saturate
+        if isinstance(pool, QueuePool):
+            size = pool.size()
+            checked_out = pool.checkedout()
+            overflow = max(pool.overflow(), 0)
+
+            # a negative max_overflow means the pool may grow without limit
+            if pool._max_overflow >= 0:
+                capacity = size + pool._max_overflow
+                saturation = checked_out / capacity
+
+        with self.__lock:
+            average_wait = self.total_wait / self.checkouts if self.checkouts else 0.0
+
+            return PoolStats(size, checked_out, overflow, capacity, saturation,
+                             self.checkouts, self.timeouts, average_wait, self.max_wait)
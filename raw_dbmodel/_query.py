@@ -0,0 +1,355 @@
+from typing import (TYPE_CHECKING, Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union)
+
+from sqlalchemy import TextClause
+from typing_extensions import Generic
+
+from raw_dbmodel._hydration import hydrate, hydrate_all
+from raw_dbmodel._metadata import describe
+from raw_dbmodel._pagination import DEFAULT_PAGE_SIZE, Page, decode_cursor, encode_cursor
+from raw_dbmodel._rows import ProjectedRow, project, project_all, project_tuples
+from raw_dbmodel._statements import get_metrics, select_statement, unbounded_limit
+from raw_dbmodel._types import _T, DictOrStr, ListStrOrNone, DtypeBackend, Metrics
+from raw_dbmodel.exceptions import ParameterTypeError, DictOrStrType, ListStrOrNoneType
+from raw_dbmodel.utils import DEFAULT_BATCH_SIZE, DotDict, is_dict_or_str, is_list_str_or_none, import_optional
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+    from raw_dbmodel._async_compat import AsyncRepositoryBase
+    from raw_dbmodel._compat import RepositoryBase
+
+__all__ = ("QueryBase", "Query", "AsyncQuery")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(__all__))
+
+
+def is_count(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+class QueryBase(Generic[_T]):
+    """
+    Immutable select over the model of a repository. Every builder method
+    returns a new query, so one repository can serve concurrent callers and
+    a chain never leaks into the next one.
+    """
+
+    __slots__ = ('__repository', '__fields', '__where', '__operators', '__order_by', '__after', '__limit',
+                 '__offset')
+
+    def __init__(self, repository: Union['RepositoryBase[_T]', 'AsyncRepositoryBase[_T]'], *, fields: str = '*',
+                 where: Optional[DictOrStr] = None, operators: ListStrOrNone = None,
+                 order_by: Tuple[str, ...] = (), after: Optional[Tuple[Any, ...]] = None,
+                 limit: Optional[int] = None, offset: Optional[int] = None) -> None:
+        self.__repository = repository
+        self.__fields = fields
+        self.__where = where
+        self.__operators = operators
+        self.__order_by = order_by
+        self.__after = after
+        self.__limit = limit
+        self.__offset = offset
+
+    def __replace(self, **changes: Any) -> 'QueryBase[_T]':
+        state = {'fields': self.__fields, 'where': self.__where, 'operators': self.__operators,
+                 'order_by': self.__order_by, 'after': self.__after, 'limit': self.__limit, 'offset': self.__offset}
+
+        return type(self)(self.__repository, **{**state, **changes})
+
+    @property
+    def repository(self) -> Union['RepositoryBase[_T]', 'AsyncRepositoryBase[_T]']:
+        return self.__repository
+
+    @property
+    def projected(self) -> bool:
+        # a projection reads ProjectedRow objects instead of models
+        return self.__fields != '*'
+
+    def select(self, *fields: str) -> 'QueryBase[_T]':
+        """
+        Read only the given columns. Where a model would be returned, a
+        ProjectedRow of those columns is returned, a tuple with the columns
+        as attributes, since the model can not be built from some of them.
+        """
+        if not fields or not all(isinstance(field, str) for field in fields):
+            raise ParameterTypeError(0, 'The fields must be one or more strings')
+
+        return self.__replace(fields=', '.join(fields))
+
+    def where(self, where: Optional[DictOrStr], operators: ListStrOrNone = None) -> 'QueryBase[_T]':
+
+        if where is not None and not is_dict_or_str(where):
+            raise ParameterTypeError(DictOrStrType)
+
+        if not is_list_str_or_none(operators):
+            raise ParameterTypeError(ListStrOrNoneType)
+
+        return self.__replace(where=where, operators=operators)
+
+    def order_by(self, *columns: str) -> 'QueryBase[_T]':
+        if not all(isinstance(column, str) for column in columns):
+            raise ParameterTypeError(0, 'The columns to order by must be strings, \'-column\' sorts descending')
+
+        return self.__replace(order_by=columns, after=None)
+
+    def limit(self, limit: Optional[int]) -> 'QueryBase[_T]':
+        if limit is not None and not is_count(limit):
+            raise ValueError('The limit must be an integer greater than or equal to 0')
+
+        return self.__replace(limit=limit)
+
+    def offset(self, offset: Optional[int]) -> 'QueryBase[_T]':
+        if offset is not None and not is_count(offset):
+            raise ValueError('The offset must be an integer greater than or equal to 0')
+
+        return self.__replace(offset=offset)
+
+    def get_data(self) -> 'QueryBase[_T]':
+        return self.where(None)
+
+    def get_one(self, where: DictOrStr, operators: ListStrOrNone = None) -> 'QueryBase[_T]':
+        if not is_dict_or_str(where):
+            raise ParameterTypeError(DictOrStrType)
+
+        return self.where(where, operators)
+
+    def keyset(self, order_by: Optional[Union[str, Tuple[str, ...]]] = None, page_size: int = DEFAULT_PAGE_SIZE,
+               after: Optional[str] = None) -> 'QueryBase[_T]':
+        """
+        Page of page_size rows after the cursor, read with a predicate on the
+        ordering columns instead of an offset. The primary key is appended to
+        the ordering, so every row has a unique position. One more row than
+        page_size is selected to know if there is a next page.
+        """
+        if not is_count(page_size) or page_size < 1:
+            raise ValueError('The page size must be an integer greater than 0')
+
+        columns = (order_by,) if isinstance(order_by, str) else tuple(order_by or ())
+        names = [column.lstrip('-') for column in columns]
+        columns += tuple(column for column in describe(self.__repository.model).primary_key if column not in names)
+
+        return self.order_by(*columns).__replace(
+            after=None if after is None else decode_cursor(after, columns), limit=page_size + 1, offset=None)
+
+    def page(self, rows: List[Dict[str, Any]], *, as_dict: bool = False, validate: bool = False) -> Page:
+        page_size = self.__limit - 1
+        items = rows[:page_size]
+        next_cursor = None
+
+        if len(rows) > page_size:
+            try:
+                values = tuple(items[-1][column.lstrip('-')] for column in self.__order_by)
+            except KeyError:
+                raise ValueError('The selected fields must contain the columns of the page ordering')
+
+            next_cursor = encode_cursor(self.__order_by, values)
+
+        if as_dict:
+            return Page([DotDict(row) for row in items], next_cursor)
+
+        if self.projected:
+            return Page(project_all(self.__repository.model, items), next_cursor)
+
+        return Page(hydrate_all(self.__repository.model, items, validate), next_cursor)
+
+    def statement(self, *, first: bool = False) -> Tuple[TextClause, Dict[str, Any]]:
+        limit = self.__limit
+        bounded = first or limit is not None or self.__offset is not None
+
+        if first:
+            limit = 1 if limit is None else min(limit, 1)
+
+        if limit is None and self.__offset is not None:
+            limit = unbounded_limit(self.__repository.engine.dialect.name)
+
+        statement, parameters = select_statement(
+            self.__repository.model, self.__fields, self.__where, self.__operators, order_by=self.__order_by,
+            after=self.__after is not None, limit=bounded, offset=self.__offset is not None)
+
+        if self.__after is not None:
+            parameters.update({f'k{index}': value for index, value in enumerate(self.__after)})
+
+        if bounded:
+            parameters['limit'] = limit
+
+        if self.__offset is not None:
+            parameters['offset'] = self.__offset
+
+        return statement, parameters
+
+    def count_statement(self) -> Tuple[TextClause, Dict[str, Any]]:
+        # the rows matching the where, the ordering and the page do not change the count
+        return select_statement(self.__repository.model, 'count(*) as count', self.__where, self.__operators)
+
+    def exists_statement(self) -> Tuple[TextClause, Dict[str, Any]]:
+        statement, parameters = select_statement(self.__repository.model, '1 as found', self.__where,
+                                                 self.__operators, limit=True)
+        parameters['limit'] = 1
+
+        return statement, parameters
+
+    def aggregate_statement(self, metrics: Metrics,
+                            group_by: Union[str, Tuple[str, ...]] = ()) -> Tuple[TextClause, Dict[str, Any]]:
+        group_by = (group_by,) if isinstance(group_by, str) else tuple(group_by)
+        columns = describe(self.__repository.model).columns
+
+        for column in group_by:
+            if column not in columns:
+                raise ValueError(f'Can not group by {column}, it is not a column of the model')
+
+        fields = ', '.join((*group_by, get_metrics(metrics, columns)))
+
+        # one row per group, in the order of the groups unless the query is ordered
+        return select_statement(self.__repository.model, fields, self.__where, self.__operators, group_by=group_by,
+                                order_by=self.__order_by or group_by)
+
+
+class Query(QueryBase[_T]):
+    __slots__ = ()
+
+    def __rows(self) -> List[ProjectedRow]:
+        return project_tuples(self.repository.model, *self.repository._read(*self.statement(), mode='rows'))
+
+    def count(self) -> int:
+        return self.repository._read(*self.count_statement(), mode='first')['count']
+
+    def exists(self) -> bool:
+        return self.repository._read(*self.exists_statement(), mode='first') is not None
+
+    def aggregate(self, metrics: Metrics, group_by: Union[str, Tuple[str, ...]] = (), *,
+                  as_df: bool = False) -> Union[List[DotDict], 'DataFrame']:
+        statement, parameters = self.aggregate_statement(metrics, group_by)
+
+        if as_df:
+            return self.repository._read(statement, parameters, mode='as_pd')
+
+        return [DotDict(row) for row in self.repository._read(statement, parameters, mode='all')]
+
+    def all(self, *, validate: bool = False) -> Union[List[_T], List[ProjectedRow]]:
+        if self.projected:
+            return self.__rows()
+
+        return hydrate_all(self.repository.model, self.repository._read(*self.statement(), mode='all'), validate)
+
+    def first(self, *, validate: bool = False) -> Optional[Union[_T, ProjectedRow]]:
+        row = self.repository._read(*self.statement(first=True), mode='first')
+
+        if self.projected:
+            return project(self.repository.model, row)
+
+        return hydrate(self.repository.model, row, validate)
+
+    def as_model(self, *, validate: bool = False) -> Optional[Union[_T, ProjectedRow]]:
+        return self.first(validate=validate)
+
+    def paginate(self, order_by: Optional[Union[str, Tuple[str, ...]]] = None, page_size: int = DEFAULT_PAGE_SIZE,
+                 after: Optional[str] = None, *, as_dict: bool = False, validate: bool = False) -> Page:
+        query = self.keyset(order_by, page_size, after)
+
+        return query.page(self.repository._read(*query.statement(), mode='all'), as_dict=as_dict, validate=validate)
+
+    def as_dict(self) -> Optional[DotDict]:
+        row = self.repository._read(*self.statement(first=True), mode='first')
+
+        return None if row is None else DotDict(row)
+
+    def stream(self, *, batch_size: int = DEFAULT_BATCH_SIZE, as_dict: bool = False,
+               validate: bool = False) -> Iterator[Union[_T, DotDict, ProjectedRow]]:
+        return self.repository._stream(*self.statement(), batch_size=batch_size, as_dict=as_dict, validate=validate,
+                                       projection=self.projected)
+
+    def as_df(self, *, chunksize: Optional[int] = None,
+              dtype_backend: DtypeBackend = 'numpy') -> Optional[Union['DataFrame', Iterator['DataFrame']]]:
+
+        if dtype_backend not in ('numpy', 'pyarrow'):
+            raise ValueError('The dtype backend must be \'numpy\' or \'pyarrow\'')
+
+        if chunksize is not None:
+            return self.repository._frames(*self.statement(), chunksize=chunksize, dtype_backend=dtype_backend)
+
+        if dtype_backend == 'pyarrow':
+            table = self.as_arrow()
+
+            return None if table is None else table.to_pandas(types_mapper=import_optional('pandas').ArrowDtype)
+
+        model_found = self.repository._read(*self.statement(), mode='as_pd')
+
+        if model_found.empty:
+            return None
+
+        return model_found
+
+    def as_arrow(self, *, batch_size: int = DEFAULT_BATCH_SIZE) -> Optional[Any]:
+        tables = list(self.repository._arrow_tables(*self.statement(), batch_size=batch_size))
+
+        if not tables:
+            return None
+
+        # a column that is null in a whole batch is typed as null, promote it
+        # to the type found in the other batches
+        return import_optional('pyarrow').concat_tables(tables, promote_options='default')
+
+
+class AsyncQuery(QueryBase[_T]):
+    __slots__ = ()
+
+    async def count(self) -> int:
+        return (await self.repository._read(*self.count_statement(), mode='first'))['count']
+
+    async def exists(self) -> bool:
+        return await self.repository._read(*self.exists_statement(), mode='first') is not None
+
+    async def aggregate(self, metrics: Metrics, group_by: Union[str, Tuple[str, ...]] = (), *,
+                        as_df: bool = False) -> Union[List[DotDict], 'DataFrame']:
+        statement, parameters = self.aggregate_statement(metrics, group_by)
+
+        if as_df:
+            return await self.repository._read(statement, parameters, mode='as_pd')
+
+        return [DotDict(row) for row in await self.repository._read(statement, parameters, mode='all')]
+
+    async def all(self, *, validate: bool = False) -> Union[List[_T], List[ProjectedRow]]:
+        if self.projected:
+            return project_tuples(self.repository.model, *await self.repository._read(*self.statement(), mode='rows'))
+
+        return hydrate_all(self.repository.model, await self.repository._read(*self.statement(), mode='all'),
+                           validate)
+
+    async def first(self, *, validate: bool = False) -> Optional[Union[_T, ProjectedRow]]:
+        row = await self.repository._read(*self.statement(first=True), mode='first')
+
+        if self.projected:
+            return project(self.repository.model, row)
+
+        return hydrate(self.repository.model, row, validate)
+
+    async def as_model(self, *, validate: bool = False) -> Optional[Union[_T, ProjectedRow]]:
+        return await self.first(validate=validate)
+
+    async def paginate(self, order_by: Optional[Union[str, Tuple[str, ...]]] = None,
+                       page_size: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None, *,
+                       as_dict: bool = False, validate: bool = False) -> Page:
+        query = self.keyset(order_by, page_size, after)
+
+        return query.page(await self.repository._read(*query.statement(), mode='all'), as_dict=as_dict,
+                          validate=validate)
+
+    async def as_dict(self) -> Optional[DotDict]:
+        row = await self.repository._read(*self.statement(first=True), mode='first')
+
+        return None if row is None else DotDict(row)
+
+    def stream(self, *, batch_size: int = DEFAULT_BATCH_SIZE, as_dict: bool = False,
+               validate: bool = False) -> AsyncIterator[Union[_T, DotDict, ProjectedRow]]:
+        return self.repository._stream(*self.statement(), batch_size=batch_size, as_dict=as_dict, validate=validate,
+                                       projection=self.projected)
+
+    async def as_df(self) -> Optional['DataFrame']:
+        model_found = await self.repository._read(*self.statement(), mode='as_pd')
+
+        if model_found.empty:
+            return None
+
+        return model_found
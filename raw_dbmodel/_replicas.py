@@ -0,0 +1,154 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import count
+from threading import Lock
+from time import monotonic
+from typing import Dict, Iterator, List, Literal, Sequence
+
+from sqlalchemy import Engine, text
+
+__all__ = ("Balancing", "Replica", "ReplicaSet", "reads_from_primary", "stick_to_primary", "use_primary")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(__all__))
+
+
+Balancing = Literal['round_robin', 'least_connections']
+
+# reads of the current thread / task go to the primary while set, see use_primary
+_primary: ContextVar[bool] = ContextVar('raw_dbmodel_primary', default=False)
+# monotonic time until which the reads stay on the primary after a write
+_primary_until: ContextVar[float] = ContextVar('raw_dbmodel_primary_until', default=0.0)
+
+
+def reads_from_primary() -> bool:
+    return _primary.get() or _primary_until.get() > monotonic()
+
+
+def stick_to_primary(seconds: float) -> None:
+    # a replica may still lag behind the write just made
+    if seconds > 0:
+        _primary_until.set(monotonic() + seconds)
+
+
+@contextmanager
+def use_primary() -> Iterator[None]:
+    """
+    Send the reads made inside the block to the primary, to read your own
+    writes without waiting for the replicas to catch up.
+    """
+    token = _primary.set(True)
+
+    try:
+        yield
+    finally:
+        _primary.reset(token)
+
+
+class Replica:
+    __slots__ = ('engine', 'in_use', 'failures', 'down_until')
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.in_use = 0
+        self.failures = 0
+        self.down_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return self.down_until <= monotonic()
+
+
+class ReplicaSet:
+    """
+    Read replicas of the primary database. Reads are balanced across the
+    healthy replicas, round robin or to the one with the fewest connections
+    in use. A replica that fails is out of rotation for retry_after seconds
+    and then tried again, check() pings them all at once.
+    """
+
+    def __init__(self, engines: Sequence[Engine] = (), *, balancing: Balancing = 'round_robin',
+                 retry_after: float = 30.0, read_your_writes: float = 0.0) -> None:
+
+        if balancing not in ('round_robin', 'least_connections'):
+            raise ValueError('The balancing must be \'round_robin\' or \'least_connections\'')
+
+        if retry_after <= 0:
+            raise ValueError('The retry interval must be greater than 0')
+
+        if read_your_writes < 0:
+            raise ValueError('The read your writes interval must be greater than or equal to 0')
+
+        self.replicas: List[Replica] = [Replica(engine) for engine in engines]
+        self.balancing = balancing
+        self.retry_after = retry_after
+        # seconds the reads stay on the primary after a write, 0 disables it
+        self.read_your_writes = read_your_writes
+        self.__turn = count()
+        self.__lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def candidates(self) -> List[Replica]:
+        # the healthy replicas in the order they should be tried
+        replicas = [replica for replica in self.replicas if replica.healthy]
+
+        if not replicas:
+            return replicas
+
+        if self.balancing == 'least_connections':
+            return sorted(replicas, key=lambda replica: replica.in_use)
+
+        start = next(self.__turn) % len(replicas)
+
+        return replicas[start:] + replicas[:start]
+
+    def mark_down(self, replica: Replica) -> None:
+        with self.__lock:
+            replica.failures += 1
+            replica.down_until = monotonic() + self.retry_after
+
+    def mark_up(self, replica: Replica) -> None:
+        with self.__lock:
+            replica.failures = 0
+            replica.down_until = 0.0
+
+    @contextmanager
+    def track(self, replica: Replica) -> Iterator[None]:
+        with self.__lock:
+            replica.in_use += 1
+
+        try:
+            yield
+        finally:
+            with self.__lock:
+                replica.in_use -= 1
+
+    def check(self) -> Dict[str, bool]:
+        """
+        Ping every replica, putting the ones that answer back in rotation and
+        taking the others out. Returns the health of each replica by url.
+        """
+        health = {}
+
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    connection.execute(text('select 1'))
+            except Exception:
+                self.mark_down(replica)
+            else:
+                self.mark_up(replica)
+
+            health[replica.engine.url.render_as_string()] = replica.healthy
+
+        return health
+
+    def dispose(self) -> None:
+        for replica in self.replicas:
+            replica.engine.dispose()
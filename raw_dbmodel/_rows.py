@@ -0,0 +1,92 @@
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Type
+
+from raw_dbmodel.utils import DotDict
+
+__all__ = ("ProjectedRow", "row_class", "project", "project_all", "project_tuples")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(__all__))
+
+
+class ProjectedRow(tuple):
+    """
+    Row of a projection: a tuple with the selected columns as attributes,
+    read like a DotDict (row.name, row['name'], keys(), get()) without a
+    dict per row.
+    """
+
+    __slots__ = ()
+
+    # set on every generated class, the selected columns and their position
+    _columns: Tuple[str, ...] = ()
+    _index: Dict[str, int] = {}
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, str):
+            try:
+                key = self._index[key]
+            except KeyError:
+                raise KeyError(key) from None
+
+        return tuple.__getitem__(self, key)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{column}={value!r}' for column, value in self.items())})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        index = self._index.get(key)
+
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._columns
+
+    def values(self) -> Tuple[Any, ...]:
+        return tuple(self)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return zip(self._columns, self)
+
+    def as_dict(self) -> DotDict:
+        return DotDict(zip(self._columns, self))
+
+
+@lru_cache(maxsize=256)
+def row_class(model: Type[Any], columns: Tuple[str, ...]) -> Type[ProjectedRow]:
+    """
+    Row class of the given columns of the model, generated once. Columns
+    that are not identifiers (e.g. count(*) without alias) are only read
+    by name or position.
+    """
+    fields = namedtuple('_Fields', columns, rename=True)
+
+    return type(f'{model.__name__}Row', (ProjectedRow,), {
+        '__slots__': (),
+        '__module__': __name__,
+        '_columns': columns,
+        '_index': {column: index for index, column in enumerate(columns)},
+        # the C item getters of the namedtuple, as fast as a tuple index
+        **{name: fields.__dict__[name] for name, column in zip(fields._fields, columns) if name == column},
+    })
+
+
+def project(model: Type[Any], row: Optional[Mapping]) -> Optional[ProjectedRow]:
+    return None if row is None else row_class(model, tuple(row.keys()))(row.values())
+
+
+def project_all(model: Type[Any], rows: Sequence[Mapping]) -> List[ProjectedRow]:
+    if not rows:
+        return []
+
+    cls = row_class(model, tuple(rows[0].keys()))
+
+    return [cls(row.values()) for row in rows]
+
+
+def project_tuples(model: Type[Any], columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[ProjectedRow]:
+    cls = row_class(model, tuple(columns))
+
+    return [cls(row) for row in rows]
@@ -0,0 +1,136 @@
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Iterator, Optional, Tuple, Type
+
+from sqlalchemy import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from raw_dbmodel.database import connect, get_async_engine
+
+__all__ = ("get_connection", "get_async_connection", "get_identity_map", "discard_identities", "after_commit",
+           "unit_of_work", "async_unit_of_work")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(__all__))
+
+
+# connection pinned by the innermost unit of work of the current thread / task
+_connection: ContextVar[Optional[Connection]] = ContextVar('raw_dbmodel_connection', default=None)
+_async_connection: ContextVar[Optional[AsyncConnection]] = ContextVar('raw_dbmodel_async_connection',
+                                                                      default=None)
+# models loaded by primary key in the unit of work that asked for an identity map
+_identity_map: ContextVar[Optional[Dict[Tuple[Type[Any], Hashable], Any]]] = ContextVar('raw_dbmodel_identity_map',
+                                                                                        default=None)
+# calls to make once the outermost unit of work commits, each one once, in order
+_after_commit: ContextVar[Optional[Dict[Tuple[Callable[..., Any], Tuple[Any, ...]], None]]] = \
+    ContextVar('raw_dbmodel_after_commit', default=None)
+
+
+def get_connection() -> Optional[Connection]:
+    return _connection.get()
+
+
+def get_async_connection() -> Optional[AsyncConnection]:
+    return _async_connection.get()
+
+
+def get_identity_map() -> Optional[Dict[Tuple[Type[Any], Hashable], Any]]:
+    return _identity_map.get()
+
+
+def discard_identities(model: Type[Any]) -> None:
+    # after a write the loaded instances of the model may be stale
+    identities = _identity_map.get()
+
+    if identities:
+        for key in [key for key in identities if key[0] is model]:
+            del identities[key]
+
+
+def after_commit(callback: Callable[..., Any], *args: Hashable) -> None:
+    """
+    Call callback(*args) once the outermost unit of work commits, at once
+    outside of one, never when it rolls back.
+    """
+    pending = _after_commit.get()
+
+    if pending is None:
+        callback(*args)
+    else:
+        pending[(callback, args)] = None
+
+
+@contextmanager
+def identity_scope(enabled: bool) -> Iterator[None]:
+    if not enabled or _identity_map.get() is not None:
+        yield
+        return
+
+    token = _identity_map.set({})
+
+    try:
+        yield
+    finally:
+        _identity_map.reset(token)
+
+
+@contextmanager
+def unit_of_work(engine: Optional[Engine] = None, *, savepoint: bool = False,
+                 identity_map: bool = False) -> Iterator[Connection]:
+    """
+    Pin one connection and transaction for every repository call made inside
+    the block, committing once on exit. A nested unit of work joins the outer
+    one, or opens a savepoint when savepoint=True. With identity_map=True the
+    models read by get_many are kept, and returned again, until the block ends.
+    """
+    connection = _connection.get()
+
+    if connection is not None:
+        with identity_scope(identity_map):
+            if savepoint:
+                with connection.begin_nested():
+                    yield connection
+            else:
+                yield connection
+        return
+
+    pending: Dict[Tuple[Callable[..., Any], Tuple[Any, ...]], None] = {}
+
+    with connect(engine, begin=True) as connection, identity_scope(identity_map):
+        token = _connection.set(connection)
+        pending_token = _after_commit.set(pending)
+
+        try:
+            yield connection
+        finally:
+            _after_commit.reset(pending_token)
+            _connection.reset(token)
+
+    # committed, reached only when the block did not raise
+    for callback, args in pending:
+        callback(*args)
+
+
+@asynccontextmanager
+async def async_unit_of_work(engine: Optional[AsyncEngine] = None, *, savepoint: bool = False,
+                             identity_map: bool = False) -> AsyncIterator[AsyncConnection]:
+    connection = _async_connection.get()
+
+    if connection is not None:
+        with identity_scope(identity_map):
+            if savepoint:
+                async with connection.begin_nested():
+                    yield connection
+            else:
+                yield connection
+        return
+
+    async with (engine or get_async_engine()).begin() as connection:
+        with identity_scope(identity_map):
+            token = _async_connection.set(connection)
+
+            try:
+                yield connection
+            finally:
+                _async_connection.reset(token)
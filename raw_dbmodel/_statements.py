@@ -0,0 +1,270 @@
+from collections import OrderedDict, namedtuple
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple, Type, Union
+
+from sqlalchemy import TextClause, bindparam, text
+from sqlmodel import SQLModel
+
+from raw_dbmodel._types import DictOrStr, ListStrOrNone, Metrics
+from raw_dbmodel.exceptions import ParameterTypeError, DictOrStrType, ListStrOrNoneType
+from raw_dbmodel.utils import is_dict_or_str, is_list_str_or_none
+
+__all__ = (
+    "StatementCache", "CacheInfo", "statement_cache", "get_where_conditions", "get_parameters", "get_shape",
+    "get_keyset_conditions", "get_order", "get_metrics", "unbounded_limit", "select_statement", "in_statement",
+    "update_statement", "delete_statement", "delete_in_statement"
+)
+
+
+def __dir__() -> list[str]:
+    return sorted(list(__all__))
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class StatementCache:
+    """
+    Bounded LRU of compiled statements keyed by the shape of the query
+    (model, operation, columns and operators), never by the bound values.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        if maxsize < 1:
+            raise ValueError('The size of the statement cache must be greater than 0')
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__statements: OrderedDict[Hashable, TextClause] = OrderedDict()
+        self.__lock = Lock()
+
+    def get(self, key: Optional[Hashable], builder: Callable[[], Union[str, TextClause]]) -> TextClause:
+        if key is None:
+            return self.__build(builder)
+
+        with self.__lock:
+            statement = self.__statements.get(key)
+
+            if statement is not None:
+                self.__statements.move_to_end(key)
+                self.hits += 1
+                return statement
+
+            self.misses += 1
+
+        statement = self.__build(builder)
+
+        with self.__lock:
+            self.__statements[key] = statement
+            self.__statements.move_to_end(key)
+
+            while len(self.__statements) > self.maxsize:
+                self.__statements.popitem(last=False)
+
+        return statement
+
+    @staticmethod
+    def __build(builder: Callable[[], Union[str, TextClause]]) -> TextClause:
+        statement = builder()
+
+        return text(statement) if isinstance(statement, str) else statement
+
+    def info(self) -> CacheInfo:
+        with self.__lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self.__statements))
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__statements.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+statement_cache = StatementCache()
+
+
+def get_where_conditions(where: DictOrStr, operators: ListStrOrNone = None, prefix: str = 'w') -> str:
+
+    if not is_dict_or_str(where):
+        raise ParameterTypeError(DictOrStrType)
+
+    if not is_list_str_or_none(operators):
+        raise ParameterTypeError(ListStrOrNoneType)
+
+    if isinstance(where, str):
+        return where
+
+    _where = ''
+
+    for index, field in enumerate(where.keys()):
+        separator = ' and '
+
+        if operators is not None:
+            if index < len(operators):
+                separator = f' {operators[index]} '
+
+        if index == len(where) - 1:
+            separator = ' '
+
+        _where += f"{field} = :{prefix}{index}{separator}"
+    return _where
+
+
+def get_parameters(values: DictOrStr, prefix: str) -> Dict[str, Any]:
+    if isinstance(values, str):
+        return {}
+
+    return {f"{prefix}{index}": value for index, value in enumerate(values.values())}
+
+
+def get_shape(values: DictOrStr, operators: ListStrOrNone = None) -> Optional[tuple]:
+    # raw sql conditions can not be parametrized, so they never reach the cache
+    if isinstance(values, str):
+        return None
+
+    return tuple(values.keys()), tuple(operators or ())
+
+
+def get_keyset_conditions(order_by: Tuple[str, ...], prefix: str = 'k') -> str:
+    # rows strictly after the bound row in the given order: a > :k0 or (a = :k0 and b > :k1) ...
+    columns = [(column[1:], '<') if column.startswith('-') else (column, '>') for column in order_by]
+    conditions = []
+
+    for index, (column, operator) in enumerate(columns):
+        equals = [f"{previous} = :{prefix}{position}" for position, (previous, _) in enumerate(columns[:index])]
+        conditions.append(' and '.join([*equals, f"{column} {operator} :{prefix}{index}"]))
+
+    return ' or '.join(f"({condition})" for condition in conditions)
+
+
+def get_order(order_by: Tuple[str, ...]) -> str:
+    # a leading '-' sorts the column in descending order
+    return ', '.join(f"{column[1:]} desc" if column.startswith('-') else column for column in order_by)
+
+
+AGGREGATES = ('count', 'sum', 'avg', 'min', 'max')
+
+
+def get_metrics(metrics: Metrics, columns: Sequence[str]) -> str:
+    # {'price': 'sum'} selects sum(price) as price_sum, {'*': 'count'} count(*) as count
+    if not isinstance(metrics, dict) or not metrics:
+        raise ParameterTypeError(0, 'The metrics must be a dict of column: aggregate function(s)')
+
+    fields = []
+
+    for column, functions in metrics.items():
+        if column not in columns and column != '*':
+            raise ValueError(f'Can not aggregate {column}, it is not a column of the model')
+
+        for function in (functions,) if isinstance(functions, str) else functions:
+            function = function.lower()
+
+            if function not in AGGREGATES:
+                raise ValueError(f'The aggregate function must be one of: {", ".join(AGGREGATES)}')
+
+            if column == '*' and function != 'count':
+                raise ValueError('Only count can aggregate \'*\'')
+
+            fields.append("count(*) as count" if column == '*' else f"{function}({column}) as {column}_{function}")
+
+    return ', '.join(fields)
+
+
+def unbounded_limit(dialect: str) -> Optional[int]:
+    # value bound to limit when only the offset is given, 'limit null' means no limit on postgresql
+    return {'sqlite': -1, 'mysql': 18446744073709551615, 'mariadb': 18446744073709551615}.get(dialect)
+
+
+def select_statement(model: Type[SQLModel], fields: str = '*', where: Optional[DictOrStr] = None,
+                     operators: ListStrOrNone = None, *, group_by: Tuple[str, ...] = (),
+                     order_by: Tuple[str, ...] = (), after: bool = False, limit: bool = False,
+                     offset: bool = False) -> Tuple[TextClause, Dict[str, Any]]:
+
+    def build_sql() -> str:
+        _sql = f"select {fields} from {model.__tablename__}"
+        conditions = []
+
+        if where is not None:
+            conditions.append(get_where_conditions(where, operators).rstrip())
+
+        if after:
+            conditions.append(get_keyset_conditions(order_by))
+
+        if len(conditions) == 1:
+            _sql += f" where {conditions[0]}"
+
+        if len(conditions) > 1:
+            _sql += f" where {' and '.join(f'({condition})' for condition in conditions)}"
+
+        if group_by:
+            _sql += f" group by {', '.join(group_by)}"
+
+        if order_by:
+            _sql += f" order by {get_order(order_by)}"
+
+        if limit:
+            _sql += " limit :limit"
+
+        if offset:
+            _sql += " offset :offset"
+
+        return _sql
+
+    _shape = () if where is None else get_shape(where, operators)
+    key = None
+
+    if _shape is not None:
+        key = (model, 'select', fields, *_shape, group_by, order_by, after, limit, offset)
+
+    return statement_cache.get(key, build_sql), {} if where is None else get_parameters(where, 'w')
+
+
+def in_statement(model: Type[SQLModel], column: str, fields: str = '*') -> TextClause:
+    # a single statement for any number of values, the :ids list is expanded when it is executed
+    return statement_cache.get(
+        (model, 'in', fields, column),
+        lambda: text(f"select {fields} from {model.__tablename__} where {column} in :ids").bindparams(
+            bindparam('ids', expanding=True)))
+
+
+def delete_in_statement(model: Type[SQLModel], column: str) -> TextClause:
+    return statement_cache.get(
+        (model, 'delete_in', column),
+        lambda: text(f"delete from {model.__tablename__} where {column} in :ids").bindparams(
+            bindparam('ids', expanding=True)))
+
+
+def update_statement(model: Type[SQLModel], set_fields: DictOrStr, where: DictOrStr,
+                     operators: ListStrOrNone = None) -> Tuple[TextClause, Dict[str, Any]]:
+
+    def build_sql() -> str:
+        _set = set_fields
+
+        if isinstance(set_fields, dict):
+            _set = ', '.join(f"{field} = :s{index}" for index, field in enumerate(set_fields.keys()))
+
+        _where = get_where_conditions(where, operators)
+
+        return f"update {model.__tablename__} set {_set} where {_where};"
+
+    _set_shape = get_shape(set_fields)
+    _where_shape = get_shape(where, operators)
+    key = None
+
+    if _set_shape is not None and _where_shape is not None:
+        key = (model, 'update', _set_shape[0], *_where_shape)
+
+    return statement_cache.get(key, build_sql), {**get_parameters(set_fields, 's'), **get_parameters(where, 'w')}
+
+
+def delete_statement(model: Type[SQLModel], where: DictOrStr,
+                     operators: ListStrOrNone = None) -> Tuple[TextClause, Dict[str, Any]]:
+    _shape = get_shape(where, operators)
+
+    statement = statement_cache.get(
+        _shape and (model, 'delete', *_shape),
+        lambda: f"delete from {model.__tablename__} "
+                f"where {get_where_conditions(where, operators)}")
+
+    return statement, get_parameters(where, 'w')
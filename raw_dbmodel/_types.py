@@ -4,6 +4,8 @@ from sqlmodel import SQLModel
 from typing_extensions import Annotated
 
 _T = TypeVar(name='_T', bound=SQLModel)
-TypeMode = Annotated[str, Literal['sql', 'as_pd']]
+TypeMode = Annotated[str, Literal['sql', 'as_pd', 'first', 'all', 'rows']]
 DictOrStr = Union[Dict[str, Any], str]
 ListStrOrNone = Optional[List[str]]
+Metrics = Dict[str, Union[str, List[str]]]
+DtypeBackend = Annotated[str, Literal['numpy', 'pyarrow']]
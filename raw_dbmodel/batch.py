@@ -0,0 +1,110 @@
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from sqlalchemy import Engine
+
+from raw_dbmodel._query import Query
+from raw_dbmodel._session import get_connection
+from raw_dbmodel.database import get_engine, pool_stats
+
+__all__ = ("QueryBatch", "QueryOrCallable", "gather")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(__all__))
+
+
+# workers of an engine whose pool has no fixed capacity (NullPool, unlimited overflow)
+DEFAULT_MAX_WORKERS = 8
+
+_executors: Dict[Engine, ThreadPoolExecutor] = {}
+_executors_lock = Lock()
+
+QueryOrCallable = Union[Query, Callable[[], Any]]
+
+
+def get_executor(engine: Engine) -> ThreadPoolExecutor:
+    """
+    One executor per engine, as big as its connection pool, so the batches
+    running at the same time never wait for a connection.
+    """
+    with _executors_lock:
+        executor = _executors.get(engine)
+
+        if executor is None:
+            stats = pool_stats(engine)
+            executor = ThreadPoolExecutor(max_workers=stats.capacity or stats.size or DEFAULT_MAX_WORKERS,
+                                          thread_name_prefix='raw_dbmodel_batch')
+            _executors[engine] = executor
+
+        return executor
+
+
+def _run(query: QueryOrCallable) -> Any:
+    # a query object without terminal returns all its models
+    return query.all() if isinstance(query, Query) else query()
+
+
+class QueryBatch:
+    """
+    Independent reads run concurrently, each one on its own pooled
+    connection. Queries are query objects (read with .all()) or callables
+    without arguments, e.g. lambda: repo.get_one(where={'id': 1}).as_model().
+    """
+
+    def __init__(self, *queries: QueryOrCallable, engine: Optional[Engine] = None) -> None:
+        self.engine = engine
+        self.__queries: List[QueryOrCallable] = list(queries)
+
+    def add(self, query: QueryOrCallable) -> 'QueryBatch':
+        self.__queries.append(query)
+
+        return self
+
+    def run(self, *, return_exceptions: bool = False) -> List[Any]:
+        """
+        Results in the order the queries were added. The first error is raised
+        once every query has finished, or, with return_exceptions=True, it takes
+        the place of the result of its query.
+        """
+        for query in self.__queries:
+            if not isinstance(query, Query) and not callable(query):
+                raise TypeError(f'{query!r} is not a query object or a callable')
+
+        # the connection of a unit of work can not be shared between threads
+        if get_connection() is not None or len(self.__queries) < 2:
+            futures = [self.__call(query) for query in self.__queries]
+        else:
+            executor = get_executor(self.engine or get_engine())
+            # every query runs in a copy of the caller context, e.g. use_primary() is kept
+            futures = [executor.submit(copy_context().run, _run, query) for query in self.__queries]
+            wait(futures)
+
+        results = []
+
+        for future in futures:
+            error = future.exception()
+
+            if error is not None and not return_exceptions:
+                raise error
+
+            results.append(error if error is not None else future.result())
+
+        return results
+
+    @staticmethod
+    def __call(query: QueryOrCallable) -> Future:
+        future: Future = Future()
+
+        try:
+            future.set_result(_run(query))
+        except Exception as ex:
+            future.set_exception(ex)
+
+        return future
+
+
+def gather(*queries: QueryOrCallable, engine: Optional[Engine] = None, return_exceptions: bool = False) -> List[Any]:
+    return QueryBatch(*queries, engine=engine).run(return_exceptions=return_exceptions)
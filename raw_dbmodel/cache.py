@@ -0,0 +1,188 @@
+import sys
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from itertools import count
+from threading import Lock
+from time import monotonic
+from typing import Any, Dict, Hashable, NamedTuple, Optional, Set, Tuple
+
+from raw_dbmodel.utils import is_dataframe
+
+__all__ = ("CacheBackend", "InMemoryCache", "CacheStats", "MISSING")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(__all__))
+
+
+# returned by CacheBackend.get on a miss, None is a valid cached result
+MISSING = object()
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    hit_ratio: float
+    entries: int
+    size_bytes: int
+    evictions: int
+    invalidations: int
+
+
+class CacheBackend(ABC):
+    """
+    Storage of query results for the repositories. Every entry belongs to the
+    table it was read from, so a write on the table can drop all its entries.
+    A shared backend (redis, memcached...) must store serializable values,
+    results are plain dicts, lists of dicts or DataFrames.
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Any:
+        pass
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, table: str, generation: Optional[int] = None) -> None:
+        pass
+
+    def generation(self, table: str) -> Optional[int]:
+        """
+        Changed by every invalidation of the table. The repositories read it
+        before the query and pass it to set(), which must then skip a result
+        read before a concurrent write. None when the backend does not track it.
+        """
+        return None
+
+    @abstractmethod
+    def invalidate(self, table: str) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    @abstractmethod
+    def stats(self) -> CacheStats:
+        pass
+
+
+def estimate_size(value: Any) -> int:
+    if is_dataframe(value):
+        return int(value.memory_usage(deep=True).sum())
+
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(key) + estimate_size(item) for key, item in value.items())
+
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+
+    return sys.getsizeof(value)
+
+
+class InMemoryCache(CacheBackend):
+    """
+    In process LRU with an optional time to live (seconds) and an optional
+    bound on the estimated size of the stored results.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, max_bytes: Optional[int] = None) -> None:
+        if maxsize < 1:
+            raise ValueError('The size of the cache must be greater than 0')
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.__entries: OrderedDict[Hashable, Tuple[Any, str, float, int]] = OrderedDict()
+        self.__tables: Dict[str, Set[Hashable]] = {}
+        # generation of every invalidated table and of the last clear, from one counter
+        self.__counter = count(1)
+        self.__generations: Dict[str, int] = {}
+        self.__cleared = 0
+        self.__size = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__invalidations = 0
+        self.__lock = Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            if entry is not None and entry[2] < monotonic():
+                self.__remove(key)
+                entry = None
+
+            if entry is None:
+                self.__misses += 1
+                return MISSING
+
+            self.__entries.move_to_end(key)
+            self.__hits += 1
+
+            return entry[0]
+
+    def generation(self, table: str) -> int:
+        with self.__lock:
+            return max(self.__generations.get(table, 0), self.__cleared)
+
+    def set(self, key: Hashable, value: Any, table: str, generation: Optional[int] = None) -> None:
+        size = estimate_size(value)
+
+        # a result bigger than the whole cache would only evict everything else
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        expires = monotonic() + self.ttl if self.ttl is not None else float('inf')
+
+        with self.__lock:
+            # the table was written while the value was read, it may be stale
+            if generation is not None and generation != max(self.__generations.get(table, 0), self.__cleared):
+                return
+
+            if key in self.__entries:
+                self.__remove(key)
+
+            self.__entries[key] = (value, table, expires, size)
+            self.__tables.setdefault(table, set()).add(key)
+            self.__size += size
+
+            while len(self.__entries) > self.maxsize or \
+                    (self.max_bytes is not None and self.__size > self.max_bytes):
+                self.__remove(next(iter(self.__entries)))
+                self.__evictions += 1
+
+    def invalidate(self, table: str) -> None:
+        with self.__lock:
+            for key in self.__tables.pop(table, set()):
+                self.__remove(key)
+
+            self.__generations[table] = next(self.__counter)
+            self.__invalidations += 1
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__tables.clear()
+            self.__cleared = next(self.__counter)
+            self.__size = 0
+
+    def stats(self) -> CacheStats:
+        with self.__lock:
+            requests = self.__hits + self.__misses
+
+            return CacheStats(self.__hits, self.__misses, self.__hits / requests if requests else 0.0,
+                              len(self.__entries), self.__size, self.__evictions, self.__invalidations)
+
+    def __remove(self, key: Hashable) -> None:
+        entry = self.__entries.pop(key, None)
+
+        if entry is None:
+            return
+
+        _, table, _, size = entry
+        self.__size -= size
+        keys = self.__tables.get(table)
+
+        if keys is not None:
+            keys.discard(key)
@@ -1,17 +1,169 @@
+from contextlib import contextmanager
 from logging import getLogger
-from typing import List
+from threading import Lock
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional
+from weakref import WeakKeyDictionary
 
-from sqlalchemy import Engine
+from sqlalchemy import AsyncAdaptedQueuePool, Connection, Engine, NullPool, QueuePool
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import SQLModel, create_engine
 from typing_extensions import Type
 
+from raw_dbmodel._pool import PoolMetrics, PoolStats
+from raw_dbmodel._replicas import ReplicaSet, reads_from_primary
 from raw_dbmodel.logger import setup_logging
-from raw_dbmodel.settings import config
+from raw_dbmodel.settings import Settings, get_settings
 
 setup_logging()
 logger = getLogger(__name__)
 
-engine: Engine = create_engine(config.uri, echo=False)
+# engine is served by __getattr__, built on first access
+engine: Engine
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+_replicas: Optional[ReplicaSet] = None
+_lock = Lock()
+
+# checkout waits of every engine, the primary and each replica apart
+_pool_metrics: 'WeakKeyDictionary[Engine, PoolMetrics]' = WeakKeyDictionary()
+
+
+def engine_options(settings: Settings, *, asynchronous: bool = False) -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        'echo': False,
+        'pool_pre_ping': settings.DB_POOL_PRE_PING,
+        'pool_recycle': settings.DB_POOL_RECYCLE,
+    }
+
+    if settings.DB_POOL_CLASS == 'null':
+        options['poolclass'] = NullPool
+    else:
+        options.update(poolclass=AsyncAdaptedQueuePool if asynchronous else QueuePool,
+                       pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW,
+                       pool_timeout=settings.DB_POOL_TIMEOUT)
+
+    return options
+
+
+def get_engine() -> Engine:
+    # built on first use, importing the package does not connect or read the settings
+    global _engine
+
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                settings = get_settings()
+                _engine = create_engine(settings.uri, **engine_options(settings))
+
+    return _engine
+
+
+def get_async_engine() -> AsyncEngine:
+    # built on first use, the async driver is only required by AsyncRepository
+    global _async_engine
+
+    if _async_engine is None:
+        with _lock:
+            if _async_engine is None:
+                settings = get_settings()
+                _async_engine = create_async_engine(settings.async_uri, **engine_options(settings, asynchronous=True))
+
+    return _async_engine
+
+
+def get_replicas() -> ReplicaSet:
+    # empty when the settings have no replica, every read then goes to the primary
+    global _replicas
+
+    if _replicas is None:
+        with _lock:
+            if _replicas is None:
+                settings = get_settings()
+                _replicas = ReplicaSet([create_engine(uri, **engine_options(settings))
+                                        for uri in settings.replica_uris],
+                                       balancing=settings.DB_REPLICA_BALANCING,
+                                       retry_after=settings.DB_REPLICA_RETRY_AFTER,
+                                       read_your_writes=settings.DB_REPLICA_READ_YOUR_WRITES)
+
+    return _replicas
+
+
+def get_pool_metrics(engine: Optional[Engine] = None) -> PoolMetrics:
+    engine = engine or get_engine()
+    metrics = _pool_metrics.get(engine)
+
+    if metrics is None:
+        with _lock:
+            metrics = _pool_metrics.setdefault(engine, PoolMetrics())
+
+    return metrics
+
+
+def checkout(engine: Engine) -> Connection:
+    metrics = get_pool_metrics(engine)
+    start = perf_counter()
+
+    try:
+        connection = engine.connect()
+    except PoolTimeoutError:
+        metrics.observe_timeout()
+        raise
+
+    metrics.observe(perf_counter() - start)
+
+    return connection
+
+
+@contextmanager
+def connect(engine: Optional[Engine] = None, *, begin: bool = False) -> Iterator[Connection]:
+    connection = checkout(engine or get_engine())
+
+    with connection:
+        if not begin:
+            yield connection
+            return
+
+        with connection.begin():
+            yield connection
+
+
+@contextmanager
+def connect_read(engine: Optional[Engine] = None, replicas: Optional[ReplicaSet] = None) -> Iterator[Connection]:
+    """
+    Connection for a read: to a healthy replica when there are replicas,
+    else or when every replica fails, or inside use_primary(), to the primary.
+    """
+    replicas = get_replicas() if replicas is None else replicas
+
+    if replicas and not reads_from_primary():
+        for replica in replicas.candidates():
+            try:
+                connection = checkout(replica.engine)
+            except DBAPIError:
+                logger.warning('Read replica %s is not available, taken out of rotation', replica.engine.url)
+                replicas.mark_down(replica)
+                continue
+
+            with replicas.track(replica), connection:
+                try:
+                    yield connection
+                except DBAPIError as error:
+                    # the connection was lost, not just a failed statement
+                    if error.connection_invalidated:
+                        replicas.mark_down(replica)
+                    raise
+            return
+
+    with connect(engine) as connection:
+        yield connection
+
+
+def pool_stats(engine: Optional[Engine] = None) -> PoolStats:
+    engine = engine or get_engine()
+
+    return get_pool_metrics(engine).snapshot(engine)
 
 
 def create_tables(models: List[Type]):
@@ -33,12 +185,21 @@ def create_tables(models: List[Type]):
         for msg in print_tables:
             logger.info(msg)
 
-        SQLModel.metadata.create_all(bind=engine, tables=[cls.__table__ for cls in tables if hasattr(cls, '__table__')])
+        SQLModel.metadata.create_all(bind=get_engine(),
+                                     tables=[cls.__table__ for cls in tables if hasattr(cls, '__table__')])
     else:
         logger.error('Could not create the tables, check that the imported classes are correct.')
 
 
-__all__ = ["engine", "create_tables"]
+__all__ = ["engine", "get_engine", "get_async_engine", "get_replicas", "engine_options", "checkout", "connect",
+           "connect_read", "get_pool_metrics", "pool_stats", "create_tables"]
+
+
+def __getattr__(name: str):
+    if name == 'engine':
+        return get_engine()
+
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
 
 
 def __dir__() -> list[str]:
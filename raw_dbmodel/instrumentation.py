@@ -0,0 +1,276 @@
+import re
+from bisect import bisect_left
+from functools import lru_cache, partial
+from logging import getLogger
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from raw_dbmodel.database import get_engine
+
+__all__ = ("Instrumentation", "LatencyHistogram", "StatementStats", "QueryEvent", "instrument", "statement_shape",
+           "count_rows")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(__all__))
+
+
+logger = getLogger(__name__)
+
+# upper bounds in milliseconds, the last bucket collects everything slower
+LATENCY_BUCKETS: Tuple[float, ...] = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+                                      float('inf'))
+
+OTHER_STATEMENTS = '<other>'
+
+# bind placeholders of the dbapi paramstyles: qmark, format, pyformat, named and numeric
+_PLACEHOLDER = r'(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)'
+# a parenthesized list of placeholders, e.g. an expanded IN or one row of a multi-row VALUES
+_PARAMETERS = re.compile(rf'\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)')
+_REPEATED_PARAMETERS = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+WRITE_VERBS = ('insert', 'update', 'delete')
+
+
+class QueryEvent(NamedTuple):
+    statement: str
+    parameters: Any
+    duration: float
+    rowcount: int
+    executemany: bool
+    is_write: bool
+
+
+@lru_cache(maxsize=4096)
+def statement_shape(statement: str) -> str:
+    """
+    The statement with its lists of placeholders collapsed, so an IN or a
+    multi-row VALUES counts as one statement whatever its number of values.
+    """
+    return _REPEATED_PARAMETERS.sub('(...), ...', _PARAMETERS.sub('(...)', statement))
+
+
+class LatencyHistogram:
+    """
+    Fixed bucket histogram of query latencies in milliseconds
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, milliseconds: float) -> None:
+        self.counts[bisect_left(self.buckets, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+
+    def percentile(self, q: float) -> float:
+        # upper bound of the bucket holding the q-th percentile
+        if self.count == 0:
+            return 0.0
+
+        rank = q / 100 * self.count
+        seen = 0
+
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+
+            if seen >= rank:
+                return bound
+
+        return self.buckets[-1]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum_ms': self.total,
+            'buckets': {str(bound): count for bound, count in zip(self.buckets, self.counts)},
+        }
+
+
+class StatementStats:
+
+    def __init__(self, statement: str) -> None:
+        self.statement = statement
+        self.calls = 0
+        self.errors = 0
+        # counted by the repositories once fetched, see count_rows
+        self.rows_returned = 0
+        self.rows_affected = 0
+        self.latency = LatencyHistogram()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'statement': self.statement,
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows_returned': self.rows_returned,
+            'rows_affected': self.rows_affected,
+            'p50_ms': self.latency.percentile(50),
+            'p99_ms': self.latency.percentile(99),
+            'latency': self.latency.as_dict(),
+        }
+
+
+class Instrumentation:
+    """
+    Collects per statement counters and latency histograms through the
+    before/after_cursor_execute and handle_error events of the engines it is
+    attached to, and logs the statements slower than slow_query_threshold
+    (seconds).
+    """
+
+    def __init__(self, *, slow_query_threshold: Optional[float] = None, explain: bool = False,
+                 max_statements: int = 1000) -> None:
+        self.slow_query_threshold = slow_query_threshold
+        self.explain = explain
+        self.max_statements = max_statements
+        self.__statements: Dict[str, StatementStats] = {}
+        self.__callbacks: List[Callable[[QueryEvent], None]] = []
+        self.__lock = Lock()
+
+    def attach(self, engine: Union[Engine, AsyncEngine]) -> 'Instrumentation':
+        engine = getattr(engine, 'sync_engine', engine)
+
+        event.listen(engine, 'before_cursor_execute', self.__before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self.__after_cursor_execute)
+        event.listen(engine, 'handle_error', self.__handle_error)
+
+        return self
+
+    def detach(self, engine: Union[Engine, AsyncEngine]) -> None:
+        engine = getattr(engine, 'sync_engine', engine)
+
+        event.remove(engine, 'before_cursor_execute', self.__before_cursor_execute)
+        event.remove(engine, 'after_cursor_execute', self.__after_cursor_execute)
+        event.remove(engine, 'handle_error', self.__handle_error)
+
+    def add_callback(self, callback: Callable[[QueryEvent], None]) -> None:
+        self.__callbacks.append(callback)
+
+    def remove_callback(self, callback: Callable[[QueryEvent], None]) -> None:
+        self.__callbacks.remove(callback)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self.__lock:
+            return [stats.as_dict() for stats in self.__statements.values()]
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__statements.clear()
+
+    def __statement_stats(self, statement: str) -> StatementStats:
+        # called under the lock
+        statement = statement_shape(statement)
+        stats = self.__statements.get(statement)
+
+        if stats is None:
+            key = statement if len(self.__statements) < self.max_statements else OTHER_STATEMENTS
+            stats = self.__statements.setdefault(key, StatementStats(key))
+
+        return stats
+
+    def __before_cursor_execute(self, connection, cursor, statement, parameters, context, executemany) -> None:
+        # kept on the execution context, it ends with the statement even when it fails
+        if context is not None:
+            context.raw_dbmodel_start = perf_counter()
+
+    def __after_cursor_execute(self, connection, cursor, statement, parameters, context, executemany) -> None:
+        start = getattr(context, 'raw_dbmodel_start', None)
+
+        if start is None:
+            return
+
+        duration = perf_counter() - start
+        # textual statements are not flagged by the execution context, look at the verb
+        is_write = (context is not None and bool(context.isinsert or context.isupdate or context.isdelete)) or \
+            statement.lstrip()[:6].lower() in WRITE_VERBS
+        # -1 when the driver can not tell the number of selected rows before fetching them
+        rowcount = cursor.rowcount
+
+        with self.__lock:
+            stats = self.__statement_stats(statement)
+            stats.calls += 1
+            stats.latency.observe(duration * 1000)
+
+            if is_write:
+                stats.rows_affected += max(rowcount, 0)
+            else:
+                # the rowcount of a read is -1 on most drivers until its rows are fetched
+                context.raw_dbmodel_fetched = getattr(context, 'raw_dbmodel_fetched', ())
+                context.raw_dbmodel_fetched += (partial(self.__count_rows, stats),)
+
+        if self.slow_query_threshold is not None and duration >= self.slow_query_threshold:
+            self.__log_slow_query(connection, statement, parameters, duration, is_write or executemany)
+
+        if self.__callbacks:
+            query_event = QueryEvent(statement, parameters, duration, rowcount, executemany, is_write)
+
+            for callback in self.__callbacks:
+                try:
+                    callback(query_event)
+                except Exception as ex:
+                    logger.error(f'Instrumentation callback {callback!r} failed: {ex}', extra={'markup': False})
+
+    def __count_rows(self, stats: StatementStats, rows: int) -> None:
+        with self.__lock:
+            stats.rows_returned += rows
+
+    def __handle_error(self, context) -> None:
+        # the statements failing before reaching the database have no execution context
+        if context.statement is None or context.execution_context is None:
+            return
+
+        with self.__lock:
+            self.__statement_stats(context.statement).errors += 1
+
+    def __log_slow_query(self, connection, statement: str, parameters: Any, duration: float,
+                         skip_explain: bool) -> None:
+        message = f'Slow query ({duration * 1000:.1f} ms): {statement}'
+
+        if self.explain and not skip_explain:
+            plan = self.__explain(connection, statement, parameters)
+
+            if plan is not None:
+                message += f'\n{plan}'
+
+        logger.warning(message, extra={'markup': False})
+
+    @staticmethod
+    def __explain(connection, statement: str, parameters: Any) -> Optional[str]:
+        prefix = 'explain query plan' if connection.dialect.name == 'sqlite' else 'explain'
+
+        # a cursor of its own, the one of the slow query may still have rows to fetch
+        cursor = connection.connection.dbapi_connection.cursor()
+
+        try:
+            cursor.execute(f'{prefix} {statement}', parameters)
+
+            return '\n'.join(' '.join(str(value) for value in row) for row in cursor.fetchall())
+        except Exception as ex:
+            logger.debug(f'Could not explain the slow query: {ex}', extra={'markup': False})
+
+            return None
+        finally:
+            cursor.close()
+
+
+def count_rows(result: Any, rows: int) -> None:
+    """
+    Add rows to the rows returned by the statement of the result, called by
+    the repositories once they fetched them.
+    """
+    # an AsyncResult wraps the result of the statement
+    context = getattr(getattr(result, '_real_result', None) or result, 'context', None)
+
+    for count in getattr(context, 'raw_dbmodel_fetched', ()):
+        count(rows)
+
+
+def instrument(engine: Optional[Union[Engine, AsyncEngine]] = None, **options: Any) -> Instrumentation:
+    return Instrumentation(**options).attach(engine or get_engine())
@@ -1,12 +1,28 @@
-import logging.config
+import atexit
+import logging
 import os
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import Any, Dict, Literal, Optional, TextIO
 
-import yaml
-from rich.console import Console
-from rich.logging import RichHandler
+from raw_dbmodel._logger_format import CustomFormatter, JsonFormatter
+from raw_dbmodel.utils import import_optional
 
+LogHandler = Literal['rich', 'text', 'json']
 
-def setup_logging() -> None:
+TEXT_FORMAT = '%(name)s - %(asctime)s - %(levelname)s - %(message)s'
+
+# statements run by the repositories, logged at DEBUG
+sql_logger = logging.getLogger('raw_dbmodel.sql')
+
+# handler and listener installed by the last setup_logging
+_handler: Optional[logging.Handler] = None
+_listener: Optional[QueueListener] = None
+
+
+@lru_cache(maxsize=None)
+def load_config() -> Dict[str, Any]:
     parent_directory = os.path.dirname(os.path.abspath(__file__))
     root_path = os.path.dirname(parent_directory)
     file_config = os.path.join(root_path, "raw_dbmodel/logging.yml")
@@ -15,26 +31,117 @@ def setup_logging() -> None:
         raise FileNotFoundError("File to set config logging not exists")
 
     with open(file_config, 'r') as file:
-        file_yml = yaml.safe_load(file)
+        return import_optional('yaml', 'pyyaml').safe_load(file)
+
+
+class LazyRichHandler(logging.Handler):
+    """
+    Rich console handler built on the first record, so rich is imported and
+    logging.yml read only once the package logs something.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.__handler: Optional[logging.Handler] = None
+
+    def build(self) -> logging.Handler:
+        rich_logging = import_optional('rich.logging', 'rich')
+        rich_console = import_optional('rich.console', 'rich')
+
+        _formatter = load_config()['formatters']
+        fmt = _formatter['fmt']
+        date_fmt = _formatter['date_fmt']
+
+        fmt_class = logging.Formatter(fmt=fmt, datefmt=date_fmt)
+
+        rich_handler = rich_logging.RichHandler(
+            show_time=False,
+            rich_tracebacks=True,
+            tracebacks_show_locals=True,
+            markup=True,
+            show_path=False,
+            console=rich_console.Console(),
+        )
+        rich_handler.setFormatter(fmt_class)
+
+        return rich_handler
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # called under the handler lock, the rich handler is built once
+        if self.__handler is None:
+            self.__handler = self.build()
+
+        self.__handler.handle(record)
+
+
+class LocalQueueHandler(QueueHandler):
+    """
+    Hands the records to the listener thread of the same process. Only the
+    message is merged with its arguments, formatting and writing are left
+    to the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
 
-    _formatter = file_yml['formatters']
-    fmt = _formatter['fmt']
-    date_fmt = _formatter['date_fmt']
+        return record
 
-    fmt_class = logging.Formatter(fmt=fmt, datefmt=date_fmt)
+
+def build_handler(handler: LogHandler = 'rich', stream: Optional[TextIO] = None) -> logging.Handler:
+
+    if handler == 'rich':
+        return LazyRichHandler()
+
+    if handler not in ('text', 'json'):
+        raise ValueError('The handler must be \'rich\', \'text\' or \'json\'')
+
+    stream_handler = logging.StreamHandler(stream)
+    date_fmt = load_config()['formatters']['date_fmt']
+    stream_handler.setFormatter(JsonFormatter() if handler == 'json' else CustomFormatter(TEXT_FORMAT, date_fmt))
+
+    return stream_handler
+
+
+def stop_logging() -> None:
+    # writes the records still in the queue and stops its thread
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logging(handler: LogHandler = 'rich', *, queue: bool = False, level: int = logging.INFO,
+                  stream: Optional[TextIO] = None) -> None:
+    """
+    Configure the raw_dbmodel logger, replacing what a previous call set up.
+    handler='json' writes JSON lines for production, 'text' plain lines and
+    'rich' the console output. With queue=True the calling thread only
+    enqueues the records and a background thread formats and writes them.
+    """
+    global _handler, _listener
 
     logger = logging.getLogger("raw_dbmodel")
-    console = Console()
-    rich_handler = RichHandler(
-        show_time=False,
-        rich_tracebacks=True,
-        tracebacks_show_locals=True,
-        markup=True,
-        show_path=False,
-        console=console,
-    )
-    rich_handler.setFormatter(fmt_class)
-    logger.addHandler(rich_handler)
-
-    logger.setLevel(logging.INFO)
+    target = build_handler(handler, stream)
+
+    stop_logging()
+
+    if _handler is not None:
+        logger.removeHandler(_handler)
+
+    if queue:
+        records: SimpleQueue = SimpleQueue()
+        _listener = QueueListener(records, target, respect_handler_level=True)
+        _listener.start()
+        target = LocalQueueHandler(records)
+
+    _handler = target
+    logger.addHandler(target)
+
+    logger.setLevel(level)
     logger.propagate = False
+
+
+atexit.register(stop_logging)
@@ -1,6 +1,11 @@
+from raw_dbmodel._async_compat import AsyncRepositoryBase
 from raw_dbmodel._compat import RepositoryBase
 from raw_dbmodel._types import _T
 
 
 class Repository(RepositoryBase[_T]):
     pass
+
+
+class AsyncRepository(AsyncRepositoryBase[_T]):
+    pass
@@ -1,5 +1,6 @@
 from enum import Enum
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional, Literal
 
 from pydantic import Field, StringConstraints, computed_field, field_validator
 from pydantic_core import MultiHostUrl
@@ -26,11 +27,32 @@ class Settings(BaseSettings):
     DB_PASSWORD: str
     DB_PORT: int = Field(default=5432)
     DB_URI: Optional[str] = None
+    DB_ASYNC_URI: Optional[str] = Field(default=None, description='Uri used by the async engine, defaults to DB_URI')
     DB_SCHEME: str = Field(..., description='Database engine driver', examples=[
         'psycopg2'])
     DB_MOTOR: MotorString = Field(
         ..., description='Database engine', examples=['postgres', 'myqsl', 'mariadb'])
 
+    # CONNECTION POOL
+    DB_POOL_CLASS: Literal['queue', 'null'] = Field(
+        default='queue', description='\'null\' opens a connection per checkout, e.g. behind pgbouncer')
+    DB_POOL_SIZE: int = Field(default=5, ge=1)
+    DB_MAX_OVERFLOW: int = Field(default=10, ge=0)
+    DB_POOL_TIMEOUT: float = Field(default=30.0, gt=0, description='Seconds to wait for a free connection')
+    DB_POOL_RECYCLE: int = Field(default=-1, description='Seconds after which a connection is replaced, -1 never')
+    DB_POOL_PRE_PING: bool = Field(default=False)
+
+    # READ REPLICAS
+    DB_REPLICA_HOSTS: str = Field(default='', description='Comma separated host[:port] of the read replicas',
+                                  examples=['replica-1,replica-2:5433'])
+    DB_REPLICA_URIS: str = Field(default='', description='Comma separated uris of the read replicas, '
+                                                         'used instead of DB_REPLICA_HOSTS')
+    DB_REPLICA_BALANCING: Literal['round_robin', 'least_connections'] = Field(default='round_robin')
+    DB_REPLICA_RETRY_AFTER: float = Field(default=30.0, gt=0,
+                                          description='Seconds a failed replica is out of rotation')
+    DB_REPLICA_READ_YOUR_WRITES: float = Field(default=0.0, ge=0,
+                                               description='Seconds the reads go to the primary after a write')
+
     _allowed_schemes: ClassVar[str] = ['psycopg2',
                                        'psycopg', 'pg8000', 'asyncpg', 'psycopg2cffi']
 
@@ -54,14 +76,9 @@ class Settings(BaseSettings):
                     f'Database engine not found in: {str(cls._db_motors)} ')
             return value
 
-    @computed_field
-    @property
-    def uri(self) -> str:
+    def build_uri(self, host: str, port: int) -> str:
         _scheme = ""
 
-        if self.DB_URI is not None and self.DB_URI != "":
-            return self.DB_URI
-
         if self.DB_MOTOR == DatabaseTypes.MYSQL:
             _scheme = 'mysql+'
         if self.DB_MOTOR == DatabaseTypes.POSTGRES:
@@ -71,12 +88,56 @@ class Settings(BaseSettings):
 
         _scheme += self.DB_SCHEME
 
-        return MultiHostUrl.build(scheme=_scheme, host=self.DB_LOCALHOST,
+        return MultiHostUrl.build(scheme=_scheme, host=host,
                                   username=self.DB_USERNAME,
-                                  password=self.DB_PASSWORD, port=self.DB_PORT, path=self.DB_NAME).unicode_string()
+                                  password=self.DB_PASSWORD, port=port, path=self.DB_NAME).unicode_string()
+
+    @computed_field
+    @property
+    def uri(self) -> str:
+
+        if self.DB_URI is not None and self.DB_URI != "":
+            return self.DB_URI
+
+        return self.build_uri(self.DB_LOCALHOST, self.DB_PORT)
+
+    @computed_field
+    @property
+    def replica_uris(self) -> List[str]:
+
+        if self.DB_REPLICA_URIS.strip() != "":
+            return [uri.strip() for uri in self.DB_REPLICA_URIS.split(',') if uri.strip()]
+
+        uris = []
+
+        for replica in self.DB_REPLICA_HOSTS.split(','):
+            host, _, port = replica.strip().partition(':')
+
+            if host:
+                uris.append(self.build_uri(host, int(port) if port else self.DB_PORT))
+
+        return uris
+
+    @computed_field
+    @property
+    def async_uri(self) -> str:
+        if self.DB_ASYNC_URI is not None and self.DB_ASYNC_URI != "":
+            return self.DB_ASYNC_URI
+
+        return self.uri
 
     model_config = SettingsConfigDict(
         env_file='../.env', env_file_encoding='utf-8', extra='ignore')
 
 
-config = Settings()
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    # resolved on first use so importing the package does not require the env variables
+    return Settings()
+
+
+def __getattr__(name: str):
+    if name == 'config':
+        return get_settings()
+
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
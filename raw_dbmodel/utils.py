@@ -1,4 +1,9 @@
-from typing import Any
+import importlib
+import sys
+from types import ModuleType
+from typing import Any, Optional
+
+DEFAULT_BATCH_SIZE = 1000
 
 
 def is_dict_or_str(_type: Any):
@@ -7,3 +12,40 @@ def is_dict_or_str(_type: Any):
 
 def is_list_str_or_none(_type: Any):
     return (isinstance(_type, list) and all(isinstance(value, str) for value in _type)) or _type is None
+
+
+def import_optional(module: str, package: Optional[str] = None) -> ModuleType:
+    try:
+        return importlib.import_module(module)
+    except ImportError as ie:
+        raise ImportError(f"'{module}' is required for this operation, "
+                          f"install it with: pip install {package or module}") from ie
+
+
+def is_dataframe(value: Any) -> bool:
+    # a DataFrame only exists once pandas was imported, checking does not import it
+    pandas = sys.modules.get('pandas')
+
+    return pandas is not None and isinstance(value, pandas.DataFrame)
+
+
+class DotDict(dict):
+    """
+    class to map the data in dictionary and access it through the dot
+    """
+
+    def __getattr__(self, key):
+
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(f"'Object has no attribute '{key}'")
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+    def __delattr__(self, key):
+        try:
+            del self[key]
+        except KeyError:
+            raise AttributeError(f"'Object has no attribute '{key}'")
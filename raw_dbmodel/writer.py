@@ -0,0 +1,227 @@
+from logging import getLogger
+from queue import Full
+from threading import Condition, Thread
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING, Any, Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+from typing_extensions import Generic
+
+from raw_dbmodel._types import _T
+from raw_dbmodel.cache import estimate_size
+
+if TYPE_CHECKING:
+    from raw_dbmodel._compat import RepositoryBase
+
+__all__ = ("BufferedWriter", "BatchFailure", "WriterStats")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(__all__))
+
+
+logger = getLogger(__name__)
+
+
+class BatchFailure(NamedTuple):
+    models: List[Any]
+    error: BaseException
+
+
+class WriterStats(NamedTuple):
+    rows_written: int
+    batches: int
+    failed_rows: int
+    failed_batches: int
+    pending: int
+    last_flush_seconds: float
+
+
+class BufferedWriter(Generic[_T]):
+    """
+    Write-behind inserter: add() only buffers the model, a background thread
+    inserts the buffer with insert_all, one transaction per batch, as soon as
+    it holds max_rows models, max_bytes of them or its oldest model waited
+    max_latency seconds. add() blocks while max_buffered models are pending.
+    A failed batch is not retried, it is kept in failures and passed to
+    on_error. Use it as a context manager, or call close(), to write the rest.
+    """
+
+    def __init__(self, repository: 'RepositoryBase[_T]', *, max_rows: int = 1000, max_bytes: Optional[int] = None,
+                 max_latency: float = 1.0, max_buffered: Optional[int] = None,
+                 have_autoincrement_default: bool = True,
+                 on_error: Optional[Callable[[BatchFailure], None]] = None) -> None:
+
+        if not isinstance(max_rows, int) or max_rows < 1:
+            raise ValueError('The max rows must be an integer greater than 0')
+
+        if max_bytes is not None and (not isinstance(max_bytes, int) or max_bytes < 1):
+            raise ValueError('The max bytes must be an integer greater than 0')
+
+        if max_latency <= 0:
+            raise ValueError('The max latency must be greater than 0')
+
+        max_buffered = max_rows * 10 if max_buffered is None else max_buffered
+
+        if not isinstance(max_buffered, int) or max_buffered < max_rows:
+            raise ValueError('The max buffered must be an integer greater than or equal to max rows')
+
+        self.repository = repository
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_latency = max_latency
+        self.max_buffered = max_buffered
+        self.have_autoincrement_default = have_autoincrement_default
+        self.on_error = on_error
+        self.failures: List[BatchFailure] = []
+
+        # (model, estimated size, monotonic time it was added)
+        self.__buffer: List[Tuple[_T, int, float]] = []
+        self.__bytes = 0
+        self.__in_flight = 0
+        self.__flushing = 0
+        self.__closed = False
+        self.__rows_written = self.__batches = self.__failed_rows = 0
+        self.__last_flush_seconds = 0.0
+        self.__condition = Condition()
+        self.__thread = Thread(target=self.__run, name='raw_dbmodel_writer', daemon=True)
+        self.__thread.start()
+
+    def __enter__(self) -> 'BufferedWriter[_T]':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self.__closed
+
+    def add(self, model: _T, *, timeout: Optional[float] = None) -> None:
+        """
+        Buffer the model, waiting while the buffer is full. queue.Full is
+        raised when it is still full after timeout seconds.
+        """
+        size = estimate_size(model.__dict__) if self.max_bytes is not None else 0
+        deadline = None if timeout is None else monotonic() + timeout
+
+        with self.__condition:
+            while len(self.__buffer) >= self.max_buffered and not self.__closed:
+                remaining = None if deadline is None else deadline - monotonic()
+
+                if remaining is not None and remaining <= 0:
+                    raise Full('The writer buffer is full')
+
+                self.__condition.wait(remaining)
+
+            if self.__closed:
+                raise RuntimeError('The writer is closed')
+
+            self.__buffer.append((model, size, monotonic()))
+            self.__bytes += size
+
+            # the first model starts the latency timer of the writer thread
+            if len(self.__buffer) == 1 or self.__due():
+                self.__condition.notify_all()
+
+    def add_all(self, models: Iterable[_T], *, timeout: Optional[float] = None) -> None:
+        for model in models:
+            self.add(model, timeout=timeout)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write the buffer until it is empty, False when it is not after timeout
+        seconds. The failed batches count as written.
+        """
+        with self.__condition:
+            self.__flushing += 1
+            self.__condition.notify_all()
+
+            try:
+                return self.__condition.wait_for(lambda: not self.__buffer and not self.__in_flight, timeout)
+            finally:
+                self.__flushing -= 1
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+
+        self.__thread.join(timeout)
+
+        return not self.__thread.is_alive()
+
+    def stats(self) -> WriterStats:
+        with self.__condition:
+            return WriterStats(self.__rows_written, self.__batches, self.__failed_rows, len(self.failures),
+                               len(self.__buffer) + self.__in_flight, self.__last_flush_seconds)
+
+    def __due(self) -> bool:
+        if not self.__buffer:
+            return False
+
+        return len(self.__buffer) >= self.max_rows or self.__flushing > 0 or self.__closed or \
+            (self.max_bytes is not None and self.__bytes >= self.max_bytes) or \
+            monotonic() - self.__buffer[0][2] >= self.max_latency
+
+    def __next_batch(self) -> Optional[List[_T]]:
+        with self.__condition:
+            while not self.__due():
+                if self.__closed:
+                    return None
+
+                timeout = None if not self.__buffer else self.__buffer[0][2] + self.max_latency - monotonic()
+                self.__condition.wait(timeout)
+
+            rows = self.max_rows
+            size = 0
+
+            # the batch ends at the row threshold, or before the byte threshold
+            if self.max_bytes is not None:
+                for rows, (_, model_size, _) in enumerate(self.__buffer[:self.max_rows], 1):
+                    size += model_size
+
+                    if size >= self.max_bytes:
+                        break
+
+            batch = self.__buffer[:rows]
+            del self.__buffer[:rows]
+            self.__bytes -= sum(model_size for _, model_size, _ in batch)
+            self.__in_flight = len(batch)
+            # the adders waiting for room
+            self.__condition.notify_all()
+
+        return [model for model, _, _ in batch]
+
+    def __write(self, batch: List[_T]) -> None:
+        start = perf_counter()
+        failure = None
+
+        try:
+            self.repository.insert_all(models=batch, have_autoincrement_default=self.have_autoincrement_default)
+        except Exception as ex:
+            failure = BatchFailure(batch, ex)
+            logger.error('Could not write a batch of %d rows: %s', len(batch), ex, extra={'markup': False})
+
+        with self.__condition:
+            self.__last_flush_seconds = perf_counter() - start
+
+            if failure is None:
+                self.__rows_written += len(batch)
+                self.__batches += 1
+            else:
+                self.__failed_rows += len(batch)
+                self.failures.append(failure)
+
+        if failure is not None and self.on_error is not None:
+            try:
+                self.on_error(failure)
+            except Exception as ex:
+                logger.error('Writer error callback %r failed: %s', self.on_error, ex, extra={'markup': False})
+
+        with self.__condition:
+            self.__in_flight = 0
+            self.__condition.notify_all()
+
+    def __run(self) -> None:
+        while (batch := self.__next_batch()) is not None:
+            self.__write(batch)
@@ -1 +1 @@
-from .models import User # noqa
\ No newline at end of file
+from .models import User, Product # noqa
\ No newline at end of file
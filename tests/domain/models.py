@@ -1,11 +1,17 @@
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 from sqlmodel import Field
 
-from tests.domain.schema import UserBase
+from tests.domain.schema import ProductBase, UserBase
 
 
 class User(UserBase, table=True):
     __tablename__ = 'usuarios'
 
     id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
+
+
+class Product(ProductBase, table=True):
+    __tablename__ = 'productos'
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
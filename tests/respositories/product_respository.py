@@ -0,0 +1,9 @@
+from raw_dbmodel import Repository
+from tests.domain import Product
+
+
+class ProductRepository(Repository[Product]):
+
+    @property
+    def model(self):
+        return Product
@@ -1,4 +1,4 @@
-from raw_dbmodel import Repository
+from raw_dbmodel import AsyncRepository, Repository
 from tests.domain import User
 
 
@@ -7,3 +7,10 @@ class UserRepository(Repository[User]):
     @property
     def model(self):
         return User
+
+
+class AsyncUserRepository(AsyncRepository[User]):
+
+    @property
+    def model(self):
+        return User
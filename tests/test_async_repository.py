@@ -0,0 +1,74 @@
+import unittest
+
+from assertpy import assert_that
+from raw_dbmodel import create_tables
+from tests.domain import User
+from tests.respositories.user_respository import AsyncUserRepository
+
+
+class TestAsyncUserRepository(unittest.IsolatedAsyncioTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        create_tables([User])
+
+    async def asyncSetUp(self):
+        self.userRepository = AsyncUserRepository()
+        self.user = await self.userRepository.insert(User(name='test_async', email='test_async@dev'))
+
+    async def asyncTearDown(self):
+        await self.userRepository.delete({'id': self.user.id})
+        await self.userRepository.engine.dispose()
+
+    async def test_get_one_as_model(self):
+        user = await self.userRepository.get_one(where={'id': self.user.id}).as_model()
+
+        assert_that(user).is_instance_of(User)
+        assert_that(user).has_name('test_async')
+
+    async def test_get_one_as_dict_is_none(self):
+        user = await self.userRepository.get_one(where={'id': 'unknown'}).as_dict()
+
+        assert_that(user).is_none()
+
+    async def test_get_all_is_not_empty(self):
+        users = await self.userRepository.get_all()
+
+        assert_that(users).is_not_empty()
+
+    async def test_stream_yields_dicts(self):
+        users = [user async for user in self.userRepository.get_one(
+            where={'name': 'test_async'}).stream(batch_size=1, as_dict=True)]
+
+        assert_that(users).extracting('name').contains('test_async')
+
+    async def test_count_and_exists(self):
+        count = await self.userRepository.count(where={'name': 'test_async'})
+
+        assert_that(count).is_greater_than_or_equal_to(1)
+        assert_that(await self.userRepository.exists(where={'id': 'unknown'})).is_false()
+
+    async def test_projection_reads_rows(self):
+        user = await self.userRepository.fields('name').get_one(where={'id': self.user.id}).as_model()
+
+        assert_that(user.name).is_equal_to('test_async')
+        assert_that(user.as_dict()).is_equal_to({'name': 'test_async'})
+
+    async def test_writes_discard_the_loaded_models(self):
+        async with self.userRepository.session(identity_map=True):
+            user, = await self.userRepository.get_many([self.user.id])
+            await self.userRepository.insert_all(models=[User(name='test_async_identity', email='identity@dev')])
+            reloaded, = await self.userRepository.get_many([self.user.id])
+
+        assert_that(reloaded).is_not_same_as(user)
+        await self.userRepository.delete({'name': 'test_async_identity'})
+
+    async def test_update(self):
+        is_user_updated = await self.userRepository.update({'email': 'updated@dev'}, {'id': self.user.id})
+
+        assert_that(is_user_updated).is_true()
+
+
+if __name__ == '__main__':
+    unittest.main()
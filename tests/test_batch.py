@@ -0,0 +1,50 @@
+import unittest
+from time import perf_counter, sleep
+
+from assertpy import assert_that
+from raw_dbmodel import create_tables
+from raw_dbmodel.batch import QueryBatch
+from tests.domain import User
+from tests.respositories.user_respository import UserRepository
+
+
+class TestQueryBatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        create_tables([User])
+
+    def setUp(self):
+        self.userRepository = UserRepository()
+        self.user = self.userRepository.insert(User(name='test_batch', email='test_batch@dev'))
+
+    def tearDown(self):
+        self.userRepository.delete({'id': self.user.id})
+
+    def test_results_keep_the_order_of_the_queries(self):
+        user, users, found = self.userRepository.gather(
+            lambda: self.userRepository.get_one(where={'id': self.user.id}).as_model(),
+            self.userRepository.query().where({'name': 'test_batch'}),
+            lambda: self.userRepository.get_many([self.user.id]))
+
+        assert_that(user.id).is_equal_to(self.user.id)
+        assert_that([model.id for model in users]).contains(self.user.id)
+        assert_that(found[0].id).is_equal_to(self.user.id)
+
+    def test_queries_run_concurrently(self):
+        start = perf_counter()
+
+        self.userRepository.gather(*[lambda: sleep(0.2) for _ in range(4)])
+
+        assert_that(perf_counter() - start).is_less_than(0.6)
+
+    def test_errors_are_returned_per_query(self):
+        def failing():
+            raise RuntimeError('query failed')
+
+        ok, error = QueryBatch(lambda: 1, failing).run(return_exceptions=True)
+
+        assert_that(ok).is_equal_to(1)
+        assert_that(error).is_instance_of(RuntimeError)
+        assert_that(QueryBatch(lambda: 1, failing).run).raises(RuntimeError).when_called_with()
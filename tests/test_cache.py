@@ -0,0 +1,89 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from assertpy import assert_that
+from raw_dbmodel import create_tables
+from raw_dbmodel.cache import InMemoryCache
+from tests.domain import User
+from tests.respositories.user_respository import UserRepository
+
+
+class CachedUserRepository(UserRepository):
+    cache = InMemoryCache(maxsize=16, ttl=60)
+
+
+class RacedCache(InMemoryCache):
+    # commits a write between the read of a result and its fill
+    write = None
+
+    def set(self, key, value, table, generation=None):
+        if self.write is not None:
+            write, self.write = self.write, None
+            write()
+
+        super().set(key, value, table, generation)
+
+
+class TestCachedUserRepository(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        create_tables([User])
+
+    def setUp(self):
+        self.userRepository = CachedUserRepository()
+        self.user = self.userRepository.insert(User(name='test_cache', email='test_cache@dev'))
+
+    def tearDown(self):
+        self.userRepository.delete({'id': self.user.id})
+
+    def test_repeated_read_is_a_hit(self):
+        self.userRepository.get_one(where={'id': self.user.id}).as_model()
+        hits = self.userRepository.cache_stats().hits
+
+        user = self.userRepository.get_one(where={'id': self.user.id}).as_model()
+
+        assert_that(user).has_name('test_cache')
+        assert_that(self.userRepository.cache_stats().hits).is_equal_to(hits + 1)
+
+    def test_write_invalidates_table(self):
+        self.userRepository.get_one(where={'id': self.user.id}).as_dict()
+
+        self.userRepository.update({'name': 'test_cache_updated'}, {'id': self.user.id})
+        user = self.userRepository.get_one(where={'id': self.user.id}).as_dict()
+
+        assert_that(user).contains_entry({'name': 'test_cache_updated'})
+
+    def test_session_invalidates_after_commit(self):
+        def read():
+            return self.userRepository.get_one(where={'id': self.user.id}).as_dict()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with self.userRepository.session():
+                self.userRepository.update({'email': 'test_cache_new@dev'}, {'id': self.user.id})
+                # another thread still reads, and caches, the committed row
+                assert_that(executor.submit(read).result()).contains_entry({'email': 'test_cache@dev'})
+
+        assert_that(read()).contains_entry({'email': 'test_cache_new@dev'})
+
+    def test_fill_raced_by_a_write_is_not_kept(self):
+        repository = CachedUserRepository()
+        repository.cache = RacedCache()
+        repository.cache.write = lambda: repository.update({'email': 'test_cache_new@dev'}, {'id': self.user.id})
+
+        assert_that(repository.get_one(where={'id': self.user.id}).as_model()).has_email('test_cache@dev')
+        assert_that(repository.get_one(where={'id': self.user.id}).as_model()).has_email('test_cache_new@dev')
+
+    def test_cache_is_bounded(self):
+        cache = InMemoryCache(maxsize=2)
+
+        for index in range(3):
+            cache.set(index, {'index': index}, 'usuarios')
+
+        assert_that(cache.stats().entries).is_equal_to(2)
+        assert_that(cache.stats().evictions).is_equal_to(1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+from assertpy import assert_that
+from raw_dbmodel import create_tables
+from raw_dbmodel.database import get_engine
+from raw_dbmodel.instrumentation import Instrumentation
+from tests.domain import User
+from tests.respositories.user_respository import UserRepository
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        create_tables([User])
+
+    def setUp(self):
+        self.userRepository = UserRepository()
+        self.events = []
+        self.instrumentation = Instrumentation(slow_query_threshold=0, explain=True).attach(get_engine())
+        self.instrumentation.add_callback(self.events.append)
+
+    def tearDown(self):
+        self.instrumentation.detach(get_engine())
+
+    def test_statement_shape_is_counted(self):
+        self.userRepository.get_one(where={'name': 'test'}).as_dict()
+        self.userRepository.get_one(where={'name': 'other'}).as_dict()
+
+        stats = [stats for stats in self.instrumentation.stats() if 'where name' in stats['statement']]
+
+        assert_that(stats).is_length(1)
+        assert_that(stats[0]['calls']).is_equal_to(2)
+        assert_that(stats[0]['latency']['count']).is_equal_to(2)
+        assert_that(stats[0]['rows_returned']).is_equal_to(0)
+
+    def test_lists_of_values_are_one_statement(self):
+        for size in range(1, 4):
+            self.userRepository.get_many([f'unknown{index}' for index in range(size)])
+
+        stats = [stats for stats in self.instrumentation.stats() if ' in (' in stats['statement']]
+
+        assert_that(stats).extracting('statement', 'calls').is_equal_to(
+            [('select * from usuarios where id in (...)', 3)])
+
+    def test_rows_returned_are_counted_once_fetched(self):
+        self.userRepository.insert_all(models=[User(name='test_rows', email='test_rows@dev') for _ in range(3)])
+
+        for _ in range(2):
+            rows = list(self.userRepository.iter_all(batch_size=2))
+
+        returned = sum(stats['rows_returned'] for stats in self.instrumentation.stats()
+                       if stats['statement'] == 'select * from usuarios')
+
+        assert_that(returned).is_equal_to(len(rows) * 2)
+        self.userRepository.delete({'name': 'test_rows'})
+
+    def test_callbacks_receive_query_events(self):
+        self.userRepository.update({'email': 'test@dev'}, {'name': 'unknown'})
+
+        assert_that(self.events).is_not_empty()
+        assert_that(self.events[-1].is_write).is_true()
+
+    def test_failed_statements_are_counted(self):
+        query = self.userRepository.get_one(where='unknown_column = 1')
+
+        for _ in range(2):
+            assert_that(query.as_dict).raises(Exception).when_called_with()
+
+        stats = [stats for stats in self.instrumentation.stats() if 'unknown_column' in stats['statement']]
+
+        assert_that(stats[0]['errors']).is_equal_to(2)
+        assert_that(stats[0]['calls']).is_equal_to(0)
+
+    def test_slow_query_is_logged(self):
+        with self.assertLogs('raw_dbmodel.instrumentation', level='WARNING') as logs:
+            self.userRepository.get_one(where={'name': 'test'}).as_dict()
+
+        assert_that(logs.output[0]).contains('Slow query')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import json
+import logging
+import unittest
+from io import StringIO
+
+from assertpy import assert_that
+from raw_dbmodel import create_tables
+from raw_dbmodel._logger_format import CustomFormatter, JsonFormatter
+from raw_dbmodel.logger import setup_logging, stop_logging
+from tests.domain import User
+from tests.respositories.user_respository import UserRepository
+
+
+def record(message: str, *args, level: int = logging.INFO, **extra) -> logging.LogRecord:
+    log_record = logging.LogRecord('raw_dbmodel.test', level, __file__, 1, message, args, None)
+    log_record.__dict__.update(extra)
+
+    return log_record
+
+
+class TestLogging(unittest.TestCase):
+
+    def tearDown(self):
+        setup_logging()
+
+    def test_json_formatter(self):
+        line = JsonFormatter().format(record('%s rows into [b blue]%s[/b blue]', 3, 'usuarios', rows=3))
+        entry = json.loads(line)
+
+        assert_that(entry).contains_entry({'message': '3 rows into usuarios'}, {'level': 'INFO'}, {'rows': 3})
+        assert_that(entry).does_not_contain_key('markup', 'args')
+
+    def test_custom_formatter_keeps_unmarked_messages(self):
+        formatter = CustomFormatter('%(levelname)s %(message)s')
+
+        assert_that(formatter.format(record('[b]done[/b]'))).contains('INFO done')
+        assert_that(formatter.format(record('where [id] in', markup=False))).contains('where [id] in')
+
+    def test_queue_writes_from_the_listener(self):
+        stream = StringIO()
+        setup_logging('json', queue=True, stream=stream)
+
+        logging.getLogger('raw_dbmodel.test').info('queued %d', 1)
+        stop_logging()
+
+        assert_that(json.loads(stream.getvalue())['message']).is_equal_to('queued 1')
+
+    def test_sql_is_logged_only_at_debug(self):
+        create_tables([User])
+        repository = UserRepository()
+
+        with self.assertLogs('raw_dbmodel.sql', logging.DEBUG) as logs:
+            repository.get_one(where={'name': 'test_logging'}).as_model()
+
+        assert_that(logs.output[0]).contains('select')
+        assert_that(logging.getLogger('raw_dbmodel.sql').isEnabledFor(logging.DEBUG)).is_false()
@@ -1,9 +1,13 @@
 import random
+import sys
 import unittest
+from datetime import datetime
 
 from assertpy import add_extension, assert_that, fail
 from pandas import DataFrame
 from raw_dbmodel import create_tables
+from raw_dbmodel.database import pool_stats
+from raw_dbmodel.exceptions import ParameterTypeError
 from tests.domain import User
 from tests.domain.schema import UserSchema
 from tests.respositories.user_respository import UserRepository
@@ -67,16 +71,101 @@ class TestUserRepository(unittest.TestCase):
 
         assert_that(is_insert_all_users).is_true()
 
+    def test_bulk_load(self):
+        users = (User(name=f'bulk{index}', email=f'bulk{index}@dev') for index in range(25))
+
+        result = self.userRepository.bulk_load(users, chunk_size=10)
+
+        assert_that(result.rows).is_equal_to(25)
+        assert_that(result.rows_per_second).is_greater_than(0)
+
+    def test_bulk_load_dicts_write_only_their_keys(self):
+        rows = [{'id': f'test_bulk_dict{index}', 'name': 'test_bulk_dict', 'email': 'test_bulk_dict@dev',
+                 'date': datetime.now()} for index in range(2)]
+
+        assert_that(self.userRepository.bulk_load(rows).rows).is_equal_to(2)
+        assert_that(self.userRepository.bulk_load).raises(ValueError).when_called_with(
+            [{**rows[0], 'id': 'test_bulk_dict2'}, {'id': 'test_bulk_dict3', 'name': 'test_bulk_dict'}])
+        assert_that(self.userRepository.count({'name': 'test_bulk_dict'})).is_equal_to(2)
+        self.userRepository.delete({'name': 'test_bulk_dict'})
+
     def test_list_users_is_not_empty(self):
         users = self.userRepository.get_all()
 
         assert_that(users).is_not_empty()
 
+    def test_iter_all_yields_models(self):
+        users = list(self.userRepository.iter_all(batch_size=2))
+
+        assert_that(users).is_not_empty()
+        assert_that(users[0]).is_instance_of(User)
+
+    def test_stream_query_yields_dicts(self):
+        users = list(self.userRepository.get_one(where={'name': 'test'}).stream(batch_size=1, as_dict=True))
+
+        assert_that(users).extracting('name').contains('test')
+
     def test_field_exist_in_user_model(self):
         user = self.userRepository.fields("name").get_data().as_dict()
 
         assert_that(user).contains('name')
 
+    def test_fields_do_not_leak_into_later_queries(self):
+        self.userRepository.fields("name").get_data().as_dict()
+
+        user = self.userRepository.get_data().as_dict()
+
+        assert_that(user).contains('name', 'email')
+
+    def test_projection_reads_rows_instead_of_models(self):
+        self.userRepository.insert_all(models=[User(name='test_projection', email=f'test_projection{index}@dev')
+                                               for index in range(2)])
+        query = self.userRepository.fields('id, name').where({'name': 'test_projection'})
+        users = query.all()
+        user = query.get_one(where={'id': users[0].id}).as_model()
+
+        assert_that(isinstance(user, User)).is_false()
+        assert_that(user.keys()).is_equal_to(('id', 'name'))
+        assert_that(user['name']).is_equal_to(user.name).is_equal_to(users[0].name)
+        assert_that(hasattr(user, 'email')).is_false()
+        assert_that(type(user)).is_same_as(type(users[0]))
+        assert_that(sys.getsizeof(user)).is_less_than(sys.getsizeof(dict(user)))
+        assert_that([row.id for row in query.stream(batch_size=2)]).is_equal_to([row.id for row in users])
+        assert_that(query.paginate(page_size=1).items[0]._columns).is_equal_to(('id', 'name'))
+
+        self.userRepository.delete({'name': 'test_projection'})
+
+    def test_query_pushes_order_limit_and_offset(self):
+        query = self.userRepository.query().select('id').order_by('-id')
+        ids = [user.id for user in query.stream(as_dict=True)]
+
+        assert_that([user.id for user in query.limit(2).stream(as_dict=True)]).is_equal_to(ids[:2])
+        assert_that([user.id for user in query.offset(1).stream(as_dict=True)]).is_equal_to(ids[1:])
+        assert_that(query.limit(1).offset(1).first().id).is_equal_to(ids[1])
+        assert_that(query.limit(0).first()).is_none()
+
+    def test_paginate_walks_every_row_once(self):
+        ids = sorted(user.id for user in self.userRepository.iter_all())
+        seen, cursor = [], None
+
+        while True:
+            page = self.userRepository.paginate(page_size=2, after=cursor)
+            seen += [user.id for user in page.items]
+            cursor = page.next_cursor
+
+            if cursor is None:
+                break
+
+        assert_that(seen).is_equal_to(ids)
+
+    def test_paginate_rejects_cursor_of_other_ordering(self):
+        cursor = self.userRepository.paginate(order_by='-name', page_size=1).next_cursor
+
+        assert_that(self.userRepository.paginate).raises(ValueError).when_called_with(order_by='name', after=cursor)
+
+    def test_query_rejects_negative_limit(self):
+        assert_that(self.userRepository.query().limit).raises(ValueError).when_called_with(-1)
+
     def test_validate_user_is_not_none(self):
         user = self.userRepository.get_one(where={'name': 'test'}).as_model()
 
@@ -132,6 +221,139 @@ class TestUserRepository(unittest.TestCase):
 
         assert_that(user_df).is_not_none()
 
+    def test_pool_stats_count_checkouts(self):
+        checkouts = pool_stats().checkouts
+
+        self.userRepository.get_all()
+
+        assert_that(pool_stats().checkouts).is_equal_to(checkouts + 1)
+
+    def test_models_are_hydrated_with_and_without_validation(self):
+        fast = self.userRepository.query().first()
+        validated = self.userRepository.query().first(validate=True)
+
+        assert_that(fast.date).is_instance_of(datetime)
+        assert_that(fast.model_dump()).is_equal_to(validated.model_dump())
+
+    def test_get_many_keeps_input_order(self):
+        ids = [user.id for user in self.userRepository.query().limit(3).all()]
+
+        users = self.userRepository.get_many([ids[2], 'unknown', ids[0], ids[2]], chunk_size=2)
+
+        assert_that([user and user.id for user in users]).is_equal_to([ids[2], None, ids[0], ids[2]])
+
+    def test_identity_map_returns_loaded_models(self):
+        _id = self.userRepository.query().first().id
+
+        with self.userRepository.session(identity_map=True):
+            user, = self.userRepository.get_many([_id])
+            user_again, = self.userRepository.get_many([_id])
+
+        assert_that(user_again).is_same_as(user)
+
+    def test_upsert_all_inserts_and_updates(self):
+        user = self.userRepository.query().first()
+        user.email = 'upserted@dev'
+        new_user = User(name='test_upsert', email='test_upsert@dev')
+
+        result = self.userRepository.upsert_all([user, new_user], chunk_size=1)
+
+        assert_that(result).is_equal_to((1, 1))
+        users = self.userRepository.get_many([user.id, new_user.id])
+
+        assert_that([user.email for user in users]).is_equal_to(['upserted@dev', 'test_upsert@dev'])
+        self.userRepository.delete({'id': new_user.id})
+
+    def test_upsert_all_sends_a_repeated_key_once(self):
+        user = self.userRepository.insert(User(name='test_upsert_dict', email='test_upsert_dict@dev'))
+        row = user.model_dump()
+
+        result = self.userRepository.upsert_all([{**row, 'email': 'first@dev'}, {**row, 'email': 'last@dev'}])
+
+        assert_that(result).is_equal_to((0, 1))
+        assert_that(self.userRepository.get_many([user.id])[0]).has_email('last@dev')
+        # the conflict key can not be left out of the dicts
+        assert_that(self.userRepository.upsert_all).raises(ValueError).when_called_with([{'email': 'last@dev'}])
+        self.userRepository.delete({'id': user.id})
+
+    def test_update_many_and_delete_many_report_affected_rows(self):
+        users = [User(name='test_many', email=f'test_many{index}@dev') for index in range(3)]
+        self.userRepository.insert_all(models=users)
+
+        updated = self.userRepository.update_many(
+            [({'email': f'updated{index}@dev'}, {'id': user.id}) for index, user in enumerate(users)], commit_every=2)
+        deleted = self.userRepository.delete_many([user.id for user in users] + ['unknown'], chunk_size=2)
+
+        assert_that(updated).is_equal_to(3)
+        assert_that(deleted).is_equal_to(3)
+
+    def test_update_many_applies_the_updates_in_order(self):
+        user = self.userRepository.insert(User(name='test_many_order', email='test_many_order@dev'))
+        changes = [({'email': 'a@dev'}, {'id': user.id}),
+                   ({'name': 'test_many_order', 'email': 'b@dev'}, {'id': user.id}),
+                   ({'email': 'c@dev'}, {'id': user.id})]
+
+        assert_that(self.userRepository.update_many(changes)).is_equal_to(3)
+        assert_that(self.userRepository.get_many([user.id])[0].email).is_equal_to('c@dev')
+        assert_that(self.userRepository.update_many).raises(ParameterTypeError).when_called_with([({'email': 'd'}, 1)])
+        self.userRepository.delete({'id': user.id})
+
+    def test_count_exists_and_aggregate(self):
+        users = [User(name='test_aggregate', email=f'test_aggregate{index % 2}@dev') for index in range(3)]
+        self.userRepository.insert_all(models=users)
+
+        count = self.userRepository.count(where={'name': 'test_aggregate'})
+        groups = self.userRepository.aggregate({'*': 'count', 'email': ['min', 'max']}, group_by='email',
+                                               where={'name': 'test_aggregate'})
+
+        assert_that(count).is_equal_to(3)
+        assert_that(self.userRepository.exists(where={'name': 'test_aggregate'})).is_true()
+        assert_that(self.userRepository.exists(where={'name': 'unknown'})).is_false()
+        assert_that(groups).extracting('email', 'count').is_equal_to(
+            [('test_aggregate0@dev', 2), ('test_aggregate1@dev', 1)])
+        assert_that(groups[0]).contains_entry({'email_min': 'test_aggregate0@dev'})
+        assert_that(self.userRepository.aggregate).raises(ValueError).when_called_with({'email': 'median'})
+        assert_that(self.userRepository.aggregate).raises(ValueError).when_called_with(
+            {'*': 'count'}, group_by='email; drop table usuarios')
+
+        self.userRepository.delete_many([user.id for user in users])
+
+    def test_session_reuses_one_transaction(self):
+        user = User(name='test_session', email='test_session@dev')
+
+        with self.userRepository.session():
+            self.userRepository.insert(user)
+            user_found = self.userRepository.get_one(where={'id': user.id}).as_model()
+
+        assert_that(user_found).is_not_none()
+        self.userRepository.delete({'id': user.id})
+
+    def test_session_rolls_back_on_error(self):
+        user = User(name='test_session', email='test_session@dev')
+
+        try:
+            with self.userRepository.session():
+                self.userRepository.insert(user)
+                raise RuntimeError('rollback')
+        except RuntimeError:
+            pass
+
+        assert_that(self.userRepository.get_one(where={'id': user.id}).as_model()).is_none()
+
+    def test_statement_is_reused_for_same_shape(self):
+        self.userRepository.get_one(where={'name': 'test'}).as_model()
+        hits = self.userRepository.statement_cache_info().hits
+
+        self.userRepository.get_one(where={'name': 'other'}).as_model()
+
+        assert_that(self.userRepository.statement_cache_info().hits).is_greater_than(hits)
+
+    def test_data_df_is_yielded_by_chunks(self):
+        chunks = list(self.userRepository.get_data().as_df(chunksize=1))
+
+        assert_that(chunks).is_not_empty()
+        assert_that([len(chunk) for chunk in chunks]).contains_only(1)
+
     def test_validate_if_data_df_is_none(self):
         user_df = self.userRepository.get_one(where={'name': '1'}).as_df()
 
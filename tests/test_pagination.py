@@ -0,0 +1,49 @@
+import unittest
+from datetime import datetime, time
+from decimal import Decimal
+from uuid import uuid4
+
+from assertpy import assert_that
+from raw_dbmodel import create_tables
+from raw_dbmodel._pagination import decode_cursor, encode_cursor
+from tests.domain import Product
+from tests.respositories.product_respository import ProductRepository
+
+
+class TestPagination(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        create_tables([Product])
+
+    def setUp(self):
+        self.productRepository = ProductRepository()
+        self.products = [Product(name=f'test_page{index}', price=index) for index in range(5)]
+        self.productRepository.insert_all(models=self.products)
+
+    def tearDown(self):
+        self.productRepository.delete("name like 'test_page%'")
+
+    def test_cursor_keeps_the_value_types(self):
+        order_by = ('a', 'b', 'c', 'd', 'e')
+        values = (uuid4(), time(12, 30), b'\x00\xff', Decimal('1.5'), datetime(2024, 1, 2, 3, 4))
+
+        assert_that(decode_cursor(encode_cursor(order_by, values), order_by)).is_equal_to(values)
+
+    def test_paginate_walks_a_table_with_uuid_key(self):
+        seen, cursor = [], None
+
+        while True:
+            page = self.productRepository.paginate('name', page_size=2, after=cursor)
+            seen += [product.name for product in page.items]
+            cursor = page.next_cursor
+
+            if cursor is None:
+                break
+
+        assert_that(seen).is_equal_to(sorted(product.name for product in self.products))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from contextvars import copy_context
+
+from assertpy import assert_that
+from sqlalchemy import create_engine
+from sqlmodel import SQLModel
+
+from raw_dbmodel import create_tables, use_primary
+from raw_dbmodel._replicas import ReplicaSet
+from raw_dbmodel.database import pool_stats
+from tests.domain import User
+from tests.respositories.user_respository import UserRepository
+
+
+class TestReplicaRouting(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        create_tables([User])
+        cls.replica_engine = create_engine('sqlite:////tmp/replica.db')
+        SQLModel.metadata.create_all(bind=cls.replica_engine, tables=[User.__table__])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.replica_engine.dispose()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.userRepository = UserRepository()
+        self.userRepository.replicas = ReplicaSet([self.replica_engine])
+        self.user = self.userRepository.insert(User(name='test_replica', email='test_replica@dev'))
+
+    def tearDown(self):
+        self.userRepository.delete({'id': self.user.id})
+
+    def find(self):
+        return self.userRepository.get_one(where={'id': self.user.id}).as_model()
+
+    def test_reads_go_to_the_replica(self):
+        # the replica has not received the row written to the primary
+        assert_that(self.find()).is_none()
+        assert_that([user.id for user in self.userRepository.get_all()]).does_not_contain(self.user.id)
+
+    def test_replica_checkouts_are_counted_apart(self):
+        primary, replica = pool_stats().checkouts, pool_stats(self.replica_engine).checkouts
+
+        self.find()
+
+        assert_that(pool_stats().checkouts).is_equal_to(primary)
+        assert_that(pool_stats(self.replica_engine).checkouts).is_equal_to(replica + 1)
+
+    def test_use_primary_reads_your_writes(self):
+        with use_primary():
+            assert_that(self.find().id).is_equal_to(self.user.id)
+
+        with self.userRepository.session():
+            assert_that(self.find().id).is_equal_to(self.user.id)
+
+    def test_gather_keeps_the_routing_of_the_caller(self):
+        assert_that(self.userRepository.gather(self.find, self.find)).is_equal_to([None, None])
+
+        with use_primary():
+            users = self.userRepository.gather(self.find, self.find)
+
+        assert_that([user.id for user in users]).is_equal_to([self.user.id, self.user.id])
+
+    def test_reads_stay_on_the_primary_after_a_write(self):
+        self.userRepository.replicas = ReplicaSet([self.replica_engine], read_your_writes=60)
+
+        def write_then_read():
+            self.userRepository.update({'email': 'test_replica@prod'}, {'id': self.user.id})
+
+            return self.find()
+
+        assert_that(copy_context().run(write_then_read).email).is_equal_to('test_replica@prod')
+        # the delete of tearDown must not keep the later tests on the primary
+        self.userRepository.replicas = ReplicaSet([self.replica_engine])
+
+    def test_failed_replica_is_taken_out_of_rotation(self):
+        replicas = ReplicaSet([create_engine('sqlite:////not/a/directory/replica.db'), self.replica_engine])
+        self.userRepository.replicas = replicas
+
+        for _ in range(3):
+            assert_that(self.find()).is_none()
+
+        assert_that(replicas.replicas[0].healthy).is_false()
+        assert_that(list(replicas.check().values())).is_equal_to([False, True])
+
+    def test_every_replica_down_falls_back_to_the_primary(self):
+        self.userRepository.replicas = ReplicaSet([create_engine('sqlite:////not/a/directory/replica.db')])
+
+        assert_that(self.find().id).is_equal_to(self.user.id)
+
+    def test_balancing(self):
+        engines = [create_engine('sqlite://'), create_engine('sqlite://')]
+        round_robin = ReplicaSet(engines)
+        least_connections = ReplicaSet(engines, balancing='least_connections')
+
+        first, second = (round_robin.candidates()[0].engine for _ in range(2))
+        assert_that(first).is_not_same_as(second)
+
+        with least_connections.track(least_connections.replicas[0]):
+            assert_that(least_connections.candidates()[0].engine).is_same_as(engines[1])
+
+        assert_that(ReplicaSet).raises(ValueError).when_called_with(engines, balancing='random')
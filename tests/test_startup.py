@@ -0,0 +1,30 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from assertpy import assert_that
+
+PROBE = """
+import json, sys
+import raw_dbmodel
+from raw_dbmodel import database
+print(json.dumps([[module for module in ('pandas', 'rich', 'yaml', 'pyarrow') if module in sys.modules],
+                  database._engine is None]))
+"""
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_import_does_not_load_heavy_modules_or_settings(self):
+        # without the DB_ variables reading the settings at import would fail
+        environment = {key: value for key, value in os.environ.items() if not key.startswith('DB_')}
+        result = subprocess.run([sys.executable, '-c', PROBE], env=environment, capture_output=True, text=True)
+
+        assert_that(result.returncode).described_as(result.stderr).is_equal_to(0)
+
+        imported, no_engine = json.loads(result.stdout.splitlines()[-1])
+
+        assert_that(imported).is_empty()
+        assert_that(no_engine).is_true()
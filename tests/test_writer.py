@@ -0,0 +1,75 @@
+import unittest
+from queue import Full
+from threading import Event
+from time import sleep
+
+from assertpy import assert_that
+from raw_dbmodel import create_tables
+from raw_dbmodel.writer import BufferedWriter
+from tests.domain import User
+from tests.respositories.user_respository import UserRepository
+
+
+class BlockedRepository:
+
+    def __init__(self):
+        self.release = Event()
+
+    def insert_all(self, *, models, have_autoincrement_default=True):
+        self.release.wait()
+
+
+class TestBufferedWriter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        create_tables([User])
+
+    def setUp(self):
+        self.userRepository = UserRepository()
+        self.users = [User(name=f'test_writer{i}', email=f'test_writer{i}@dev') for i in range(25)]
+
+    def tearDown(self):
+        self.userRepository.delete_many([user.id for user in self.users])
+
+    def test_batches_of_max_rows(self):
+        with BufferedWriter(self.userRepository, max_rows=10, max_latency=60) as writer:
+            writer.add_all(self.users)
+            assert_that(writer.flush(timeout=5)).is_true()
+
+            assert_that(writer.stats()._asdict()).contains_entry({'rows_written': 25}, {'batches': 3}, {'pending': 0})
+
+        assert_that(self.userRepository.get_many([user.id for user in self.users])).does_not_contain(None)
+
+    def test_flushes_after_max_latency(self):
+        writer = BufferedWriter(self.userRepository, max_latency=0.05)
+        writer.add(self.users[0])
+        sleep(0.5)
+
+        assert_that(writer.stats().rows_written).is_equal_to(1)
+        writer.close()
+
+    def test_failed_batches_are_reported(self):
+        failures = []
+
+        with BufferedWriter(self.userRepository, max_rows=1, max_latency=60, on_error=failures.append) as writer:
+            writer.add_all([self.users[0], self.users[0], self.users[1]])
+
+        assert_that(writer.stats()._asdict()).contains_entry({'rows_written': 2}, {'failed_batches': 1})
+        assert_that(failures[0].models).is_equal_to([self.users[0]])
+        assert_that(writer.closed).is_true()
+        assert_that(writer.add).raises(RuntimeError).when_called_with(self.users[2])
+
+    def test_add_blocks_when_the_buffer_is_full(self):
+        repository = BlockedRepository()
+        writer = BufferedWriter(repository, max_rows=1, max_buffered=1, max_latency=60)
+
+        # the first batch is being written, the second fills the buffer
+        writer.add(self.users[0])
+        writer.add(self.users[1])
+
+        assert_that(writer.add).raises(Full).when_called_with(self.users[2], timeout=0.1)
+
+        repository.release.set()
+        assert_that(writer.close(timeout=5)).is_true()